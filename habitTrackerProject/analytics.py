@@ -1,10 +1,24 @@
 import datetime
-import os
-from habit import Habit
-import json
+from habit import Habit, parse_entry_date
 from datetime import timedelta
 
-from utility import save_habits
+from archive import CompletedArchive
+from events import event_bus
+from settings import DATA_DIR
+
+
+def iter_all_habits(habits):
+    """
+    It yields the names of all habits one at a time.
+
+    Args:
+        habits (list): A list of Habit objects.
+
+    Yields:
+        str: The name of each habit.
+    """
+    for habit in habits:
+        yield habit.name
 
 
 def get_all_habits(habits):
@@ -17,7 +31,23 @@ def get_all_habits(habits):
     Returns:
         list: This is the list consisting of the names of all habits.
     """
-    return [habit.name for habit in habits]
+    return list(iter_all_habits(habits))
+
+
+def iter_habits_by_periodicity(habits, periodicity):
+    """
+    It yields the names of the habits with the given periodicity one at a time.
+
+    Args:
+        habits (list): A list of Habit objects.
+        periodicity (str): The periodicity to filter or group by (e.g., "daily" or "weekly").
+
+    Yields:
+        str: The name of each habit that aligns with the defined periodicity.
+    """
+    for habit in habits:
+        if habit.periodicity == periodicity:
+            yield habit.name
 
 
 def get_habits_by_periodicity(habits, periodicity):
@@ -31,7 +61,24 @@ def get_habits_by_periodicity(habits, periodicity):
     Returns:
         list: The list of the habit names that align with the defined periodicity.
     """
-    return [habit.name for habit in habits if habit.periodicity == periodicity]
+    return list(iter_habits_by_periodicity(habits, periodicity))
+
+
+def iter_activities(habit):
+    """
+    It yields the recorded check-in dates of a habit one at a time.
+
+    Args:
+        habit (Habit): The habit whose tracked data is listed.
+
+    Yields:
+        str: The date of each valid tracked entry, or a note for each invalid entry.
+    """
+    for entry in habit.tracked_data:
+        if isinstance(entry, dict) and "date" in entry:
+            yield entry["date"]
+        else:
+            yield f"Skipping invalid entry: {entry}"
 
 
 def get_longest_run_streak(habits):
@@ -46,40 +93,9 @@ def get_longest_run_streak(habits):
     Returns:
         int: The overall longest active streak found across all habits.
     """
-    longest_streak = 0
     today = datetime.datetime.now().date()
-
-    for habit in habits:
-        allowed_gap = get_days(habit.periodicity)
-        if not habit.tracked_data:
-            continue
-
-        # Convert the tracked date strings to date objects.
-        dates = []
-        for entry in habit.tracked_data:
-            try:
-                date_obj = datetime.datetime.strptime(entry["date"], "%Y-%m-%d %H:%M:%S").date()
-            except ValueError:
-                date_obj = datetime.datetime.strptime(entry["date"], "%Y-%m-%d").date()
-            dates.append(date_obj)
-        dates.sort()
-
-        # Calculate the consecutive streak based on allowed_gap.
-        streak = 1
-        for i in range(1, len(dates)):
-            if (dates[i] - dates[i - 1]).days == allowed_gap:
-                streak += 1
-            else:
-                streak = 1
-
-        # Verify if the streak is still active.
-        # If the gap from the last check-in to today is too large, the active streak is reset to 0.
-        if (today - dates[-1]).days > allowed_gap:
-            streak = 0
-
-        longest_streak = max(longest_streak, streak)
-
-    return longest_streak
+    # The active streak of a habit is the length of its last run, or 0 once the last check-in is too long ago.
+    return max((get_current_streak(habit, today) for habit in habits), default=0)
 
 
 def get_longest_run_streak_for_habit(habits, habit_name):
@@ -94,35 +110,115 @@ def get_longest_run_streak_for_habit(habits, habit_name):
     Returns:
         int: The active streak for the specified habit, or 0 if not found or not active.
     """
-    today = datetime.datetime.now().date()
+    habit = find_habit(habits, habit_name)
+    if habit is None:
+        return 0
+    return get_current_streak(habit)
+
+
+def find_habit(habits, habit_name):
+    """
+    Finds a habit by name, ignoring the case.
+
+    A HabitList answers from its name index; a plain list is scanned.
+
+    Args:
+        habits (list): List of Habit objects, or a HabitList.
+        habit_name (str): Name of the habit to find.
 
+    Returns:
+        Habit: The habit with exactly this name if there is one, otherwise the first habit whose name
+            only differs in case, or None if no habit has this name.
+    """
+    find = getattr(habits, "find", None)
+    if find is not None:
+        return find(habit_name)
+    # Like NameIndex.find(), an exact match wins over an earlier habit whose name only differs in case.
+    case_insensitive_match = None
     for habit in habits:
-        if habit.name.lower() == habit_name.lower():
-            allowed_gap = get_days(habit.periodicity)
-            if not habit.tracked_data:
-                return 0
-
-            dates = []
-            for entry in habit.tracked_data:
-                try:
-                    date_obj = datetime.datetime.strptime(entry["date"], "%Y-%m-%d %H:%M:%S").date()
-                except ValueError:
-                    date_obj = datetime.datetime.strptime(entry["date"], "%Y-%m-%d").date()
-                dates.append(date_obj)
-            dates.sort()
-
-            streak = 1
-            for i in range(1, len(dates)):
-                if (dates[i] - dates[i - 1]).days == allowed_gap:
-                    streak += 1
-                else:
-                    streak = 1
-
-            if (today - dates[-1]).days > allowed_gap:
-                return 0
+        if habit.name == habit_name:
+            return habit
+        if case_insensitive_match is None and habit.name.lower() == habit_name.lower():
+            case_insensitive_match = habit
+    return case_insensitive_match
+
+
+def get_current_streak(habit, today=None):
+    """
+    Computes the active consecutive run streak of a single habit.
+
+    Args:
+        habit (Habit): The habit to compute the streak for.
+        today (datetime.date): The date the streak is evaluated on, defaults to the current date.
+
+    Returns:
+        int: The active streak of the habit, or 0 if it has no check-ins or the streak is broken.
+    """
+    if today is None:
+        today = datetime.datetime.now().date()
+
+    last_check_in = habit.last_check_in()
+    if last_check_in is None:
+        return 0
+
+    allowed_gap = get_days(habit.periodicity)
+    if (today - last_check_in).days > allowed_gap:
+        return 0
+
+    dates = habit.date_index()
+    if not dates:
+        return habit.compacted["boundary_streak"]
+
+    # Walk back from the latest check-in for as long as the check-ins are one period apart.
+    streak = 1
+    for i in range(len(dates) - 1, 0, -1):
+        if (dates[i] - dates[i - 1]).days != allowed_gap:
             return streak
+        streak += 1
+
+    # The run reaches the oldest retained check-in, so it may go on into the compacted history.
+    if habit.compacted and (dates[0] - parse_entry_date(habit.compacted["last_date"])).days == allowed_gap:
+        streak += habit.compacted["boundary_streak"]
+    return streak
+
+
+def iter_streak_runs(habit):
+    """
+    Yields every check-in date of a habit with the length of the run ending on it.
+
+    A run continues while the check-ins are exactly one period apart, like in get_longest_run_streak().
+    Only the retained check-ins are yielded, but a run that started in the compacted history goes on counting.
+
+    Args:
+        habit (Habit): The habit to walk through.
+
+    Yields:
+        tuple: The check-in date (datetime.date) and the run streak reached on that date.
+    """
+    allowed_gap = get_days(habit.periodicity)
+    previous = None
+    streak = 0
+    if habit.compacted:
+        previous = parse_entry_date(habit.compacted["last_date"])
+        streak = habit.compacted["boundary_streak"]
+    for date in habit.date_index():
+        streak = streak + 1 if previous is not None and (date - previous).days == allowed_gap else 1
+        previous = date
+        yield date, streak
+
+
+def get_best_streak(habit):
+    """
+    Returns the longest run streak a habit ever reached, whether it is still active or not.
+
+    Args:
+        habit (Habit): The habit to compute the streak for.
 
-    return 0
+    Returns:
+        int: The best streak of the habit, or 0 if it has no check-ins.
+    """
+    best_streak = habit.compacted.get("best_streak", 0)
+    return max(best_streak, max((streak for _, streak in iter_streak_runs(habit)), default=0))
 
 
 def get_days(periodicity):
@@ -147,9 +243,19 @@ def get_habits_with_broken_streak(habits):
     Returns:
         list: A list of habit names with broken streaks.
     """
+    return list(iter_habits_with_broken_streak(habits))
+
+
+def iter_habits_with_broken_streak(habits):
+    """
+    Yields the names of the habits that have a broken streak, one at a time.
+
+    Args:
+        habits (list): A list of habit objects.
 
-    # Initialize an empty list to store habits with broken streaks
-    habits_with_broken_streak = []
+    Yields:
+        str: The name of each habit with a broken streak.
+    """
 
     # Get today's date
     today = datetime.datetime.now().date()
@@ -157,31 +263,13 @@ def get_habits_with_broken_streak(habits):
     # Iterated over each of the habit
     for habit in habits:
 
-        # then check if the habit has any tracked data
-        if habit.tracked_data:
-            dates = []
-
-            # Iterated over each entry in the tracked data
-            for entry in habit.tracked_data:
-                date_str = entry["date"]
-
-                if " " in date_str:
-                    # Parse the date string with time
-                    date_obj = datetime.datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S").date()
-                else:
-                    date_obj = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
-
-                # Added the parsed date to the list of dates
-                dates.append(date_obj)
-
-            # Sort the list of dates in ascending order
-            dates.sort()
+        # then check if the habit has been checked in at all, including the compacted history
+        last_check_in = habit.last_check_in()
+        if last_check_in is not None:
             # Then I compared today's date with the last check-in date
-            if (today - dates[-1]).days > get_days(habit.periodicity):
-                # so if the streak is broken, add the name of the habit to the list
-                habits_with_broken_streak.append(habit.name)
-
-    return habits_with_broken_streak
+            if (today - last_check_in).days > get_days(habit.periodicity):
+                # so if the streak is broken, yield the name of the habit
+                yield habit.name
 
 
 def get_habits_with_longest_streak(habits: list[Habit]) -> list[str]:
@@ -197,60 +285,39 @@ def get_habits_with_longest_streak(habits: list[Habit]) -> list[str]:
     Returns:
         list: A list of habit names with the longest streak.
     """
+    return list(iter_habits_with_longest_streak(habits))
+
+
+def iter_habits_with_longest_streak(habits):
+    """
+    Yields the names of the habits that have the longest streak, one at a time.
+
+    Args:
+        habits (list): A list of habit objects.
+
+    Yields:
+        str: The name of each habit with the longest streak.
+    """
 
     # first fetch the overall longest streak among all habits
     overall_longest = get_longest_run_streak(habits)
 
-    habits_with_longest = []
     # fetch today's current date
     today = datetime.datetime.now().date()
 
     # Iterated over each of the habit
     for habit in habits:
 
-        # Get the allowed interval gap in days based on the habit's periodicity
-        allowed_interval_gap = get_days(habit.periodicity)
-        if not habit.tracked_data:
-            continue
-
-        # Parse and sort the dates of that tracked data
-        dates = []
-
-        for entry in habit.tracked_data:
-            try:
-                # Trying to parse the date string with time
-                date_obj = datetime.datetime.strptime(entry["date"], "%Y-%m-%d %H:%M:%S").date()
-            except ValueError:
-
-                # But if it fails, then try to parse the date string without time
-                date_obj = datetime.datetime.strptime(entry["date"], "%Y-%m-%d").date()
-            dates.append(date_obj)
-        dates.sort()
-
-        # Evaluate the active streak for this habit.
-        streak = 1
-        for i in range(1, len(dates)):
-
-            # Confirm if the gap between that consecutive dates is equal to the allowed interval gap
-            if (dates[i] - dates[i - 1]).days == allowed_interval_gap:
-                streak += 1
-            else:
-                streak = 1
-
-        # Confirming if the streak is still currently active
-        if (today - dates[-1]).days > allowed_interval_gap:
-            streak = 0
+        # Evaluate the active streak for this habit, which is 0 once it is no longer active.
+        streak = get_current_streak(habit, today)
 
         # Then again, check if this evaluated active streak equals the overall longest
         if streak == overall_longest and streak != 0:
-            # If it is, then add the habit name to the list
-            habits_with_longest.append(habit.name)
+            # If it is, then yield the habit name
+            yield habit.name
 
-    # Returning the list of habits containing the longest streak
-    return habits_with_longest
 
-
-def check_in(habits, habit_name, completed):
+def check_in(habits, habit_name, completed, data_dir=DATA_DIR, now=None):
     """
         Check-in a habit and then updates the tracked data.
 
@@ -258,6 +325,8 @@ def check_in(habits, habit_name, completed):
             habits (list): A list of Habit objects.
             habit_name (str): The name of the habit to check in.
             completed (bool): Whether the habit has been completed.
+            data_dir (str): The data directory holding the habit files.
+            now (datetime.datetime): The time of the check-in, defaults to the current time.
 
         Returns:
             None
@@ -265,78 +334,120 @@ def check_in(habits, habit_name, completed):
         Notes:
             This function checks if the habit has already been checked in for the day or week, depending on
             the habit's periodicity.
-            If the habit has been completed, it is added to the list of completed habits and removed from the
-            list of active habits.
+            If the habit has been completed, it is removed from the list of active habits.
+            Saving, the completed habits archive, the rollups and the change log are updated by the
+            subscribers of the "checked_in" and "goal_completed" events, see the events module.
         """
-    for habit in habits:
-        if habit.name == habit_name:
-            # retrieve current timestamp for the check-in.
-            today = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            # Checking if the habit has already been checked-in today (for daily habits)
-            # or this week (for weekly habits periodicity).
-            if habit.tracked_data:
-                tracked_dates = [entry["date"] for entry in habit.tracked_data]
-
-                if habit.periodicity == "daily":
-                    today_date = datetime.datetime.now().strftime("%Y-%m-%d")
-                    tracked_dates_daily = [entry["date"].split(" ")[0] for entry in habit.tracked_data]
-                    if today_date in tracked_dates_daily:
-                        print("You have already checked in for today.")
-                        return
-
-                elif habit.periodicity == "weekly":
-                    today_date = datetime.datetime.now().strftime("%Y-%m-%d")
-                    tracked_dates_weekly = [entry["date"].split(" ")[0] for entry in habit.tracked_data]
-
-                    # Decide the week number for each tracked date.
-                    tracked_weeks = [datetime.datetime.strptime(date, "%Y-%m-%d").isocalendar()[1] for date in
-                                     tracked_dates_weekly]
-                    current_week = datetime.datetime.now().isocalendar()[1]
-
-                    if current_week in tracked_weeks:
-                        print("You have already checked in for this week.")
-                        return
-
-            # today's check-in is appended to the habit's tracked data.
-            habit.tracked_data.append({"date": today})
-
-            # And if the habit is marked as finished, update progress and check for goal completion.
-            if completed:
-                habit.progress += 1
-                if habit.is_completed():
-                    print(f"Congratulations! You have completed the habit '{habit_name}'!")
-                    completed_habits = load_completed_habits()
-                    completed_habit = Habit(
-                        name=habit.name,
-                        periodicity=habit.periodicity,
-                        goal=habit.goal,
-                        progress=habit.progress,
-                        description=habit.description,
-                        creation_date=habit.creation_date,
-                        tracked_data=habit.tracked_data
-                    )
-                    completed_habits.append(completed_habit)
-                    save_completed_habits(completed_habits)
-
-                    # Here, the code removes the completed habit from the active list and save the changes.
-                    habits.remove(habit)
-                    save_habits(habits)
-                    print("Check-in successful!")
-                    return
-
-            save_habits(habits)
-            print("Check-in successful!")
-            return
-    print("Habit not found.")
-
-
-def progress_summary(habits):
+    habit = find_habit(habits, habit_name)
+    if habit is None or habit.name != habit_name:
+        print("Habit not found.")
+        return
+
+    # retrieve current timestamp for the check-in.
+    if now is None:
+        now = datetime.datetime.now()
+    today = now.strftime("%Y-%m-%d %H:%M:%S")
+
+    # Checking if the habit has already been checked-in today (for daily habits)
+    # or this ISO week (for weekly habits periodicity).
+    if habit.checked_in_during_period(now.date()):
+        if habit.periodicity == "weekly":
+            print("You have already checked in for this week.")
+        else:
+            print("You have already checked in for today.")
+        return
+
+    bus = event_bus(habits, data_dir)
+
+    # today's check-in is appended to the habit's tracked data.
+    habit.tracked_data.append({"date": today})
+    # And if the habit is marked as finished, update progress.
+    if completed:
+        habit.progress += 1
+    bus.emit("checked_in", habit.name, habits, {"date": today, "completed": completed})
+
+    # Then check for goal completion.
+    if completed and habit.is_completed():
+        print(f"Congratulations! You have completed the habit '{habit_name}'!")
+        completed_habit = Habit(
+            name=habit.name,
+            periodicity=habit.periodicity,
+            goal=habit.goal,
+            progress=habit.progress,
+            description=habit.description,
+            creation_date=habit.creation_date,
+            tracked_data=habit.tracked_data,
+            compacted=habit.compacted
+        )
+
+        # Here, the code removes the completed habit from the active list, the subscribers archive it.
+        habits.remove(habit)
+        bus.emit("goal_completed", habit.name, habits, {"habit": completed_habit.to_dict()})
+
+    print("Check-in successful!")
+
+
+def count_check_ins_between(habits, start, end):
+    """
+    Counts the check-ins of every habit within a date range.
+
+    Args:
+        habits (list): A list of Habit objects.
+        start (datetime.date): The first day of the range (inclusive).
+        end (datetime.date): The last day of the range (inclusive).
+
+    Returns:
+        dict: A dictionary mapping each habit name to its number of check-ins within the range.
+    """
+    return {habit.name: habit.count_check_ins_between(start, end) for habit in habits}
+
+
+def completion_rate_between(habits, start, end):
+    """
+    Calculates the overall completion rate of all habits within a date range.
+
+    Every habit contributes its own completion ratio, and the overall rate is their average.
+
+    Args:
+        habits (list): A list of Habit objects.
+        start (datetime.date): The first day of the range (inclusive).
+        end (datetime.date): The last day of the range (inclusive).
+
+    Returns:
+        float: The average completion ratio between 0.0 and 1.0, or 0.0 if there are no habits.
+    """
+    if not habits:
+        return 0.0
+    return sum(habit.completion_ratio_between(start, end) for habit in habits) / len(habits)
+
+
+def rolling_window_stats(habit, days, today=None):
+    """
+    Computes the check-in count and completion ratio of a habit over the last few days.
+
+    Args:
+        habit (Habit): The habit to compute the statistics for.
+        days (int): The length of the window in days, ending today.
+        today (datetime.date): The last day of the window, defaults to the current date.
+
+    Returns:
+        tuple: The number of check-ins and the completion ratio within the window.
+    """
+    if today is None:
+        today = datetime.datetime.now().date()
+    start = today - timedelta(days=days - 1)
+    return habit.count_check_ins_between(start, today), habit.completion_ratio_between(start, today)
+
+
+def progress_summary(habits, windows=(7, 30)):
     """
     Produces a summary of progress for each habit.
 
+    Next to the overall progress, the summary shows rolling-window statistics for each window length.
+
     Args:
         habits (list): A list of Habit objects.
+        windows (tuple): The rolling window lengths in days.
 
     Returns:
         str: A multi-line string summarizing each habit's name, goal, description, and progress.
@@ -344,43 +455,38 @@ def progress_summary(habits):
 
     summary = []
     for habit in habits:
-        summary.append(
-            f"Habit: {habit.name}, Goal: {habit.goal}, Description: {habit.description}, Progress: {habit.progress}/{habit.goal}")
+        line = f"Habit: {habit.name}, Goal: {habit.goal}, Description: {habit.description}, Progress: {habit.progress}/{habit.goal}"
+        for days in windows:
+            count, ratio = rolling_window_stats(habit, days)
+            line += f", Last {days} days: {count} check-ins ({ratio:.0%})"
+        summary.append(line)
     return "\n".join(summary)
 
 
-def load_completed_habits():
+def load_completed_habits(data_dir=DATA_DIR):
     """
-    completed habits from the JSON file is loaded.
+    completed habits from the completed habits archive is loaded.
+
+    Args:
+        data_dir (str): The data directory holding the archive.
 
     Returns:
-        list: A list of Habit objects loaded from the completed habits file.
-            Returns an empty list if the file is not found.
+        list: A list of Habit objects loaded from the completed habits archive.
+            Returns an empty list if the archive does not exist yet.
     """
 
-    try:
-        with open("data/completed_habits.json", "r") as file:
-            data = json.load(file)
-            return [Habit.from_dict(habit) for habit in data]
-    except FileNotFoundError:
-        return []
+    return CompletedArchive(data_dir).load()
 
 
-def save_completed_habits(completed_habits):
+def save_completed_habits(completed_habits, data_dir=DATA_DIR):
     """
-    The list of completed habits is saved to a JSON file.
+    The list of completed habits is saved to the completed habits archive.
 
-    Ensures the data directory exists before writing to the file.
+    The archive is rewritten from scratch, the data directory is created if needed.
 
     Args:
         completed_habits (list): A list of Habit objects representing completed habits.
+        data_dir (str): The data directory holding the archive.
     """
 
-    data_dir = "data"
-    if not os.path.exists(data_dir):
-        os.makedirs(data_dir)
-
-    file_path = os.path.join(data_dir, "completed_habits.json")
-    data = [habit.to_dict() for habit in completed_habits]
-    with open(file_path, "w") as file:
-        json.dump(data, file, indent=4)
+    CompletedArchive(data_dir).rewrite(completed_habits)
@@ -0,0 +1,263 @@
+"""
+This module stores the completed habits in an append-only archive.
+
+The archive consists of two files inside the data directory:
+    - completed_habits.dat: every completed habit is written as the habit name on its own line,
+      followed by the JSON representation of the whole habit on the next line.
+    - completed_habits.idx: a small offset index with one fixed-size record per completed habit.
+
+Both files are memory-mapped for reading, so counting, listing names and paging completed habits
+only touch the index and the first bytes of each record instead of decoding every historic check-in.
+
+The check-ins that the retention policy moved out of the active habits are kept in a third file,
+'cold_history.jsonl', which iter_cold_history() reads back.
+"""
+
+import json
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+
+from habit import Habit
+from migrations import normalise_habit
+from settings import DATA_DIR
+
+# Each index record holds the offset of the record in the data file, the total record length
+# and the length of the encoded habit name that starts the record.
+INDEX_RECORD = struct.Struct("<QII")
+
+
+class CompletedArchive:
+    """
+    Append-only, memory-mapped archive of the completed habits.
+
+    Opened read-only, an old completed_habits.json file is read into memory instead of being imported
+    into the archive files, so nothing is written to the data directory.
+
+    Args:
+        data_dir (str): The directory holding the archive files.
+        read_only (bool): Whether to leave the data directory as it is.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, read_only=False):
+        self.data_dir = data_dir
+        self.data_path = os.path.join(data_dir, "completed_habits.dat")
+        self.index_path = os.path.join(data_dir, "completed_habits.idx")
+        self.legacy_path = os.path.join(data_dir, "completed_habits.json")
+        self.read_only = read_only
+        # The habits of a legacy file that was not imported, because the archive was opened read-only.
+        self._legacy = None
+        if read_only:
+            if self._needs_legacy_import():
+                self._legacy = self._read_legacy_file()
+        else:
+            self._migrate_legacy_file()
+
+    def __len__(self):
+        """Counts the archived habits from the size of the index alone."""
+        if self._legacy is not None:
+            return len(self._legacy)
+        try:
+            return os.path.getsize(self.index_path) // INDEX_RECORD.size
+        except FileNotFoundError:
+            return 0
+
+    def __iter__(self):
+        """Yields every archived habit in the order they were completed."""
+        if self._legacy is not None:
+            yield from self._legacy
+            return
+        with self._mapped(self.index_path) as index, self._mapped(self.data_path) as data:
+            for position in range(self._count(index)):
+                yield self._read_habit(index, data, position)
+
+    def append(self, habit):
+        """
+        Adds a completed habit to the end of the archive.
+
+        The record is written to the data file first and only then referenced from the index,
+        so an interrupted write never leaves the index pointing at a partial record.
+
+        Args:
+            habit (Habit): The habit that has reached its goal.
+        """
+        self._check_writable()
+        self._ensure_data_dir()
+        name_bytes = habit.name.encode("utf-8")
+        record = name_bytes + b"\n" + json.dumps(habit.to_dict()).encode("utf-8") + b"\n"
+
+        with open(self.data_path, "ab") as data_file:
+            offset = data_file.tell()
+            data_file.write(record)
+
+        with open(self.index_path, "ab") as index_file:
+            index_file.write(INDEX_RECORD.pack(offset, len(record), len(name_bytes)))
+
+    def iter_names(self, offset=0, limit=None):
+        """
+        Yields the names of the archived habits without decoding their check-ins.
+
+        Args:
+            offset (int): The number of archived habits to skip.
+            limit (int): The maximum number of names to yield, or None for all of them.
+
+        Yields:
+            str: The name of each selected completed habit.
+        """
+        if self._legacy is not None:
+            stop = None if limit is None else offset + limit
+            yield from (habit.name for habit in self._legacy[offset:stop])
+            return
+        with self._mapped(self.index_path) as index, self._mapped(self.data_path) as data:
+            stop = self._count(index)
+            if limit is not None:
+                stop = min(stop, offset + limit)
+            for position in range(offset, stop):
+                yield self._read_name(index, data, position)
+
+    def names(self, offset=0, limit=None):
+        """
+        Returns the names of the archived habits without decoding their check-ins.
+
+        Args:
+            offset (int): The number of archived habits to skip.
+            limit (int): The maximum number of names to return, or None for all of them.
+
+        Returns:
+            list: The names of the selected completed habits.
+        """
+        return list(self.iter_names(offset, limit))
+
+    def get(self, position):
+        """
+        Loads a single archived habit by its position in the archive.
+
+        Args:
+            position (int): The zero-based position of the habit.
+
+        Returns:
+            Habit: The archived habit.
+        """
+        if self._legacy is not None:
+            if position < 0 or position >= len(self._legacy):
+                raise IndexError("Completed habit position out of range")
+            return self._legacy[position]
+        with self._mapped(self.index_path) as index, self._mapped(self.data_path) as data:
+            if position < 0 or position >= self._count(index):
+                raise IndexError("Completed habit position out of range")
+            return self._read_habit(index, data, position)
+
+    def contains(self, habit):
+        """
+        Checks whether a habit is already archived, by its name and creation date.
+
+        Only the archived habits with the same name are decoded.
+
+        Args:
+            habit (Habit): The habit to look for.
+
+        Returns:
+            bool: True if the habit is in the archive.
+        """
+        for position, name in enumerate(self.iter_names()):
+            if name == habit.name and self.get(position).creation_date == habit.creation_date:
+                return True
+        return False
+
+    def load(self):
+        """Returns all archived habits as a list of Habit objects."""
+        return list(self)
+
+    def rewrite(self, habits):
+        """
+        Replaces the whole archive with the given habits.
+
+        Args:
+            habits (list): A list of Habit objects representing completed habits.
+        """
+        self._check_writable()
+        self._ensure_data_dir()
+        for path in (self.data_path, self.index_path):
+            if os.path.exists(path):
+                os.remove(path)
+        # Creating empty files keeps the legacy JSON file from being imported again.
+        open(self.data_path, "wb").close()
+        open(self.index_path, "wb").close()
+        for habit in habits:
+            self.append(habit)
+
+    def _needs_legacy_import(self):
+        return not os.path.exists(self.data_path) and os.path.exists(self.legacy_path)
+
+    def _read_legacy_file(self):
+        with open(self.legacy_path, "r") as file:
+            try:
+                data = json.load(file)
+            except json.JSONDecodeError:
+                data = []
+        return [Habit.from_canonical(normalise_habit(habit)) for habit in data]
+
+    def _migrate_legacy_file(self):
+        """Imports the old completed_habits.json file once, the first time the archive is opened."""
+        if self._needs_legacy_import():
+            self.rewrite(self._read_legacy_file())
+
+    def _check_writable(self):
+        if self.read_only:
+            raise RuntimeError("The completed habits archive was opened read-only")
+
+    def _ensure_data_dir(self):
+        if not os.path.exists(self.data_dir):
+            os.makedirs(self.data_dir)
+
+    @staticmethod
+    def _count(index):
+        return len(index) // INDEX_RECORD.size if index is not None else 0
+
+    @staticmethod
+    def _read_name(index, data, position):
+        offset, _, name_length = INDEX_RECORD.unpack_from(index, position * INDEX_RECORD.size)
+        return data[offset:offset + name_length].decode("utf-8")
+
+    @staticmethod
+    def _read_habit(index, data, position):
+        offset, length, name_length = INDEX_RECORD.unpack_from(index, position * INDEX_RECORD.size)
+        return Habit.from_canonical(json.loads(data[offset + name_length + 1:offset + length]))
+
+    @staticmethod
+    @contextmanager
+    def _mapped(path):
+        """Memory-maps a file read-only, yielding None when it is missing or empty."""
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            yield None
+            return
+        with open(path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+
+def cold_history_file(data_dir=DATA_DIR):
+    """Returns the path of the cold history file inside a data directory."""
+    return os.path.join(data_dir, "cold_history.jsonl")
+
+
+def iter_cold_history(data_dir=DATA_DIR, habit_name=None):
+    """
+    Yields the compacted check-ins from the cold history file.
+
+    Args:
+        data_dir (str): The data directory holding the cold history.
+        habit_name (str): Only yield the check-ins of this habit, or None for all habits.
+
+    Yields:
+        dict: Each compacted tracked_data entry, with the name of its habit under "habit".
+    """
+    file_path = cold_history_file(data_dir)
+    if not os.path.exists(file_path):
+        return
+    with open(file_path, "r") as file:
+        for line in file:
+            entry = json.loads(line)
+            if habit_name is None or entry["habit"] == habit_name:
+                yield entry
@@ -0,0 +1,151 @@
+"""
+This benchmark compares the date parsing of the analytics functions before and after the shared parser.
+
+It loads the habits fixture from 'data/habits.json' and builds a larger store of distinct copies of it:
+every copy has its own name and its check-ins shifted by its own number of days, so the copies neither share
+their Habit objects (and the date index cached on them) nor all of their date strings. It then times:
+    - the old strptime parsing (full format first, date-only format after a ValueError),
+    - the slicing parser behind parse_entry_date without its cache (parse_entry_date.__wrapped__),
+    - parse_entry_date with an empty cache and with a warm cache,
+    - the old get_longest_run_streak, which parsed every tracked date of every habit with strptime on every call,
+      next to the current one, on fresh copies (nothing cached yet) and on copies that were already queried.
+
+Run it from the project directory with:
+    python benchmarks/bench_date_parsing.py
+"""
+
+import datetime
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import get_days, get_longest_run_streak  # noqa: E402
+from habit import Habit, parse_entry_date  # noqa: E402
+from migrations import migrate  # noqa: E402
+from settings import DATA_DIR  # noqa: E402
+
+REPEAT = 200
+
+
+def legacy_parse(date_str):
+    """The parsing that every analytics function did before the shared parser."""
+    try:
+        return datetime.datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S").date()
+    except ValueError:
+        return datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+
+
+def legacy_longest_run_streak(habits):
+    """get_longest_run_streak as it was before the shared parser and the date index."""
+    longest_streak = 0
+    today = datetime.datetime.now().date()
+
+    for habit in habits:
+        allowed_gap = get_days(habit.periodicity)
+        if not habit.tracked_data:
+            continue
+
+        dates = sorted(legacy_parse(entry["date"]) for entry in habit.tracked_data)
+        streak = 1
+        for i in range(1, len(dates)):
+            if (dates[i] - dates[i - 1]).days == allowed_gap:
+                streak += 1
+            else:
+                streak = 1
+        if (today - dates[-1]).days > allowed_gap:
+            streak = 0
+        longest_streak = max(longest_streak, streak)
+
+    return longest_streak
+
+
+def load_fixture():
+    with open(os.path.join(DATA_DIR, "habits.json"), "r") as file:
+        return migrate(json.load(file))["habits"]
+
+
+def shift_date(date_str, days):
+    """Moves a stored date string by a number of days, keeping its time if it has one."""
+    shifted = (parse_entry_date.__wrapped__(date_str) + datetime.timedelta(days=days)).isoformat()
+    return shifted + date_str[10:]
+
+
+def make_habits(fixture, copies=REPEAT):
+    """
+    Builds distinct Habit objects from the fixture.
+
+    Args:
+        fixture (list): The canonical habit dictionaries of the fixture.
+        copies (int): The number of copies of the fixture.
+
+    Returns:
+        list: New Habit objects, each copy with its own name and with its dates shifted by the copy number.
+    """
+    habits = []
+    for copy in range(copies):
+        for data in fixture:
+            tracked_data = [dict(entry, date=shift_date(entry["date"], copy)) for entry in data["tracked_data"]]
+            habits.append(Habit.from_canonical(dict(data, name=f"{data['name']} {copy}", tracked_data=tracked_data)))
+    return habits
+
+
+def time_call(function, number=5, setup=None):
+    """
+    Returns the best time of several calls of a function.
+
+    Args:
+        function (callable): The function to time, called with the result of setup if there is one.
+        number (int): The number of timed calls.
+        setup (callable): Optional function building a fresh argument before every call, which is not timed.
+    """
+    times = []
+    for _ in range(number):
+        args = (setup(),) if setup is not None else ()
+        started = timeit.default_timer()
+        function(*args)
+        times.append(timeit.default_timer() - started)
+    return min(times)
+
+
+def main():
+    fixture = load_fixture()
+    habits = make_habits(fixture)
+    timestamps = [entry["date"] for habit in habits for entry in habit.tracked_data]
+    # Dates without a time are what add_tracked_data stores, and what made the old code raise ValueError.
+    date_only = [date_str[:10] for date_str in timestamps]
+
+    print(f"Parsing {len(timestamps)} dates ({len(set(timestamps))} distinct, "
+          f"cache size {parse_entry_date.cache_info().maxsize})")
+    uncached_parse = parse_entry_date.__wrapped__
+    for label, dates in (("date and time", timestamps), ("date only", date_only)):
+        legacy = time_call(lambda: [legacy_parse(date_str) for date_str in dates])
+        uncached = time_call(lambda: [uncached_parse(date_str) for date_str in dates])
+
+        def cold():
+            parse_entry_date.cache_clear()
+            return [parse_entry_date(date_str) for date_str in dates]
+
+        cold_time = time_call(cold)
+        warm = time_call(lambda: [parse_entry_date(date_str) for date_str in dates])
+        print(f"{label:>14}: strptime {legacy * 1000:8.2f} ms | uncached {uncached * 1000:7.2f} ms "
+              f"({legacy / uncached:5.1f}x) | cached cold {cold_time * 1000:7.2f} ms ({legacy / cold_time:5.1f}x) "
+              f"| warm {warm * 1000:7.2f} ms ({legacy / warm:5.1f}x)")
+
+    def fresh_habits():
+        parse_entry_date.cache_clear()
+        return make_habits(fixture)
+
+    legacy_streak = time_call(legacy_longest_run_streak, setup=fresh_habits)
+    cold_streak = time_call(get_longest_run_streak, setup=fresh_habits)
+    warm_streak = time_call(lambda: get_longest_run_streak(habits))
+    print(f"longest run streak over {len(habits)} habits: legacy {legacy_streak * 1000:.2f} ms | "
+          f"current, fresh habits {cold_streak * 1000:.2f} ms ({legacy_streak / cold_streak:.1f}x) | "
+          f"current, queried before {warm_streak * 1000:.2f} ms ({legacy_streak / warm_streak:.1f}x)")
+    assert legacy_longest_run_streak(habits) == get_longest_run_streak(habits)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""
+This load test measures how many operations per second the tenant stores sustain under concurrent users.
+
+Every simulated user runs in its own thread and performs a random mix of operations against its
+tenant store: adding habits, checking them in, deleting them and running analytics queries.
+Several users can share one tenant (--tenants lower than --users) to put concurrent writers on the same files,
+and by default fewer stores may be open than there are tenants (--max-open lower than --tenants), so stores
+are evicted and reopened while other users work.
+
+Every operation pins the tenant store with TenantStores.use(). An operation that raises is counted as a failure
+of its user, and the run then counts as failed, like a run with lost updates.
+
+At the end the stores are closed, the data directories are read back from disk and compared with
+what every user did, so updates lost on the way to the disk are reported next to:
+    - the throughput in operations per second,
+    - the latency percentiles per operation,
+    - the size of the data files.
+
+Every user has its own simulated clock, which starts --operations days in the past. The check-ins are made at
+the time of that clock, and when none of the user's habits can be checked in on the simulated day any more,
+the clock moves on to the next day. So the habits build up a history of check-ins over the simulated days, and
+the operations follow the configured mix; the report shows the mix that was actually performed, and the latency
+of the check-ins by the number of check-ins the habit already had.
+
+The operations of every user are drawn from a random generator seeded with --seed and the user number,
+so two runs with the same arguments perform the same operations (only the thread interleaving differs).
+
+Run it from the project directory with, for example:
+    python benchmarks/loadtest.py --users 16 --tenants 4 --operations 500 --seed 1 --max-open 2
+"""
+
+import argparse
+import contextlib
+import datetime
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import get_longest_run_streak, progress_summary  # noqa: E402
+from archive import CompletedArchive  # noqa: E402
+from habit import Habit  # noqa: E402
+from tenancy import TenantStores, tenant_data_dir  # noqa: E402
+from utility import load_habits  # noqa: E402
+
+# The share of every operation in the mix.
+OPERATION_MIX = {"check_in": 0.55, "add_habit": 0.15, "delete_habit": 0.05, "analytics": 0.25}
+PERCENTILES = (50, 90, 99)
+# The goals are drawn up to this number of check-ins, so habits build up a history before they are completed.
+MAX_GOAL = 30
+# The check-in latencies are grouped by the number of earlier check-ins of the habit, in steps of this size.
+HISTORY_STEP = 10
+
+
+def percentile(sorted_values, percent):
+    """
+    Returns a percentile of already sorted values, using the nearest rank.
+
+    Args:
+        sorted_values (list): The values in ascending order.
+        percent (float): The percentile between 0 and 100.
+
+    Returns:
+        float: The value at the percentile, or 0.0 for no values.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(percent / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class SimulatedUser:
+    """
+    One user performing random operations against a tenant store, remembering what the outcome should be.
+
+    Check-ins only go to habits that were not checked in during the current day (or ISO week) of the simulated
+    clock yet, since check_in rejects a second check-in in the same period. When there is no such habit left,
+    the clock moves on to the next day. Only a user without any active habit adds a habit instead.
+
+    Args:
+        number (int): The number of the user, which makes its habit names unique within the tenant.
+        user_id (str): The ID of the tenant the user works on.
+        stores (TenantStores): The shared cache of tenant stores.
+        seed (int): The seed of the run.
+        start (datetime.datetime): The time the simulated clock starts at.
+    """
+
+    def __init__(self, number, user_id, stores, seed, start):
+        self.number = number
+        self.user_id = user_id
+        self.stores = stores
+        self.random = random.Random(f"{seed}-{number}")
+        self.clock = start
+        self.latencies = {operation: [] for operation in OPERATION_MIX}
+        # The check-in latencies by the number of earlier check-ins of the habit, rounded down to HISTORY_STEP.
+        self.history_latencies = {}
+        # The number of attempted operations by operation, which is the mix actually performed.
+        self.performed = {operation: 0 for operation in OPERATION_MIX}
+        self.attempted = 0
+        # A description of every operation that raised.
+        self.failures = []
+        # The expected state of every habit the user created, by name.
+        self.expected = {}
+        self._created = 0
+
+    def run(self, operations):
+        """Performs the given number of operations."""
+        names = list(OPERATION_MIX)
+        weights = list(OPERATION_MIX.values())
+        for _ in range(operations):
+            operation = self.random.choices(names, weights)[0]
+            if operation == "check_in" and not self._active():
+                operation = "add_habit"
+            elif operation == "check_in":
+                # Every active habit can be checked in again within a week.
+                while not self._unchecked():
+                    self.clock += datetime.timedelta(days=1)
+            self.attempted += 1
+            self.performed[operation] += 1
+            arguments = (self.random.choice(self._unchecked()),) if operation == "check_in" else ()
+            started = time.perf_counter()
+            try:
+                getattr(self, operation)(*arguments)
+            except Exception as error:
+                self.failures.append(f"user{self.number} {operation}: {type(error).__name__}: {error}")
+                continue
+            latency = time.perf_counter() - started
+            self.latencies[operation].append(latency)
+            if operation == "check_in":
+                # The habit had one check-in less while it was timed.
+                history = (self.expected[arguments[0]]["check_ins"] - 1) // HISTORY_STEP * HISTORY_STEP
+                self.history_latencies.setdefault(history, []).append(latency)
+
+    def add_habit(self):
+        self._created += 1
+        name = f"user{self.number}-habit{self._created}"
+        goal = self.random.randint(1, MAX_GOAL)
+        periodicity = self.random.choice(["daily", "weekly"])
+        with self.stores.use(self.user_id) as store:
+            store.add_habit(Habit(name, periodicity, goal))
+        self.expected[name] = {"status": "active", "goal": goal, "progress": 0, "check_ins": 0,
+                               "periodicity": periodicity, "period": None}
+
+    def check_in(self, name):
+        completed = self.random.random() < 0.8
+        with self.stores.use(self.user_id) as store:
+            store.check_in(name, completed, self.clock)
+
+        expected = self.expected[name]
+        expected["check_ins"] += 1
+        expected["period"] = self._period(expected["periodicity"])
+        expected["progress"] += int(completed)
+        if expected["progress"] >= expected["goal"]:
+            expected["status"] = "completed"
+
+    def delete_habit(self):
+        active = self._active()
+        if not active:
+            return
+        name = self.random.choice(active)
+        with self.stores.use(self.user_id) as store:
+            if store.delete_habit(name):
+                self.expected[name]["status"] = "deleted"
+
+    def analytics(self):
+        with self.stores.use(self.user_id) as store:
+            habits = store.habits
+            get_longest_run_streak(habits)
+            progress_summary(habits)
+
+    def _active(self):
+        return sorted(name for name, expected in self.expected.items() if expected["status"] == "active")
+
+    def _unchecked(self):
+        return [name for name in self._active()
+                if self.expected[name]["period"] != self._period(self.expected[name]["periodicity"])]
+
+    def _period(self, periodicity):
+        """Returns the day, or the ISO week of a weekly habit, of the simulated clock."""
+        today = self.clock.date()
+        return today.isocalendar()[:2] if periodicity == "weekly" else today
+
+
+def lost_updates(users, root):
+    """
+    Compares what the users did with the data directories read back from disk.
+
+    Args:
+        users (list): The SimulatedUser objects of the run.
+        root (str): The data root of the tenants.
+
+    Returns:
+        list: A description of every habit whose state on disk differs from the expected state.
+    """
+    lost = []
+    on_disk = {}
+    for user in users:
+        if user.user_id not in on_disk:
+            data_dir = tenant_data_dir(root, user.user_id)
+            on_disk[user.user_id] = (
+                {habit.name: habit for habit in load_habits(data_dir, read_only=True)},
+                set(CompletedArchive(data_dir, read_only=True).names()),
+            )
+        active, completed = on_disk[user.user_id]
+
+        for name, expected in user.expected.items():
+            habit = active.get(name)
+            if expected["status"] == "completed":
+                if name not in completed:
+                    lost.append(f"{user.user_id}/{name}: completion not archived")
+            elif expected["status"] == "deleted":
+                if habit is not None:
+                    lost.append(f"{user.user_id}/{name}: deleted habit is back")
+            elif habit is None:
+                lost.append(f"{user.user_id}/{name}: habit missing")
+            else:
+                # Check-ins older than the retention horizon may have been compacted when a store was reopened.
+                check_ins = len(habit.tracked_data) + habit.compacted.get("check_ins", 0)
+                if check_ins != expected["check_ins"] or habit.progress != expected["progress"]:
+                    lost.append(f"{user.user_id}/{name}: {check_ins} check-ins and progress {habit.progress}, "
+                                f"expected {expected['check_ins']} and {expected['progress']}")
+    return lost
+
+
+def file_sizes(root):
+    """Returns the total size in bytes of every kind of data file below the data root, by file name."""
+    sizes = {}
+    for directory, _, files in os.walk(root):
+        for file_name in files:
+            sizes[file_name] = sizes.get(file_name, 0) + os.path.getsize(os.path.join(directory, file_name))
+    return sizes
+
+
+def run(root, users=8, tenants=8, operations=200, seed=0, max_open=4, durability="deferred"):
+    """
+    Runs the load test.
+
+    Args:
+        root (str): The data root the tenants are created in, which should be empty.
+        users (int): The number of concurrent simulated users.
+        tenants (int): The number of tenants the users are spread over.
+        operations (int): The number of operations per user.
+        seed (int): The seed of the random operations.
+        max_open (int): The maximum number of open tenant stores.
+        durability (str): The durability level of the tenant stores.
+
+    Returns:
+        dict: The wall time, the number of attempted and completed operations, the performed mix,
+            the failed operations, the latencies per operation and of the check-ins by history,
+            the number of simulated days, the file sizes and the lost updates.
+    """
+    stores = TenantStores(root, max_open=max_open, durability=durability)
+    # At most one simulated day passes per operation, so the clocks start that many days in the past.
+    start = datetime.datetime.combine(datetime.date.today() - datetime.timedelta(days=operations),
+                                      datetime.time(8))
+    simulated = [SimulatedUser(number, f"tenant{number % tenants}", stores, seed, start)
+                 for number in range(users)]
+    threads = [threading.Thread(target=user.run, args=(operations,)) for user in simulated]
+
+    # check_in and the other commands report to the terminal, which is not what is measured here.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        stores.close()
+        flushed = time.perf_counter() - started
+
+    latencies = {operation: sorted(value for user in simulated for value in user.latencies[operation])
+                 for operation in OPERATION_MIX}
+    history_latencies = {}
+    for user in simulated:
+        for history, values in user.history_latencies.items():
+            history_latencies.setdefault(history, []).extend(values)
+    return {
+        "elapsed": elapsed,
+        "flushed": flushed,
+        "attempted": sum(user.attempted for user in simulated),
+        "operations": sum(len(values) for values in latencies.values()),
+        "performed": {operation: sum(user.performed[operation] for user in simulated) for operation in OPERATION_MIX},
+        "failures": [failure for user in simulated for failure in user.failures],
+        "latencies": latencies,
+        "history_latencies": {history: sorted(values) for history, values in sorted(history_latencies.items())},
+        "simulated_days": max(((user.clock - start).days for user in simulated), default=0),
+        "file_sizes": file_sizes(root),
+        "lost": lost_updates(simulated, root),
+    }
+
+
+def print_report(report):
+    """Prints the results of a run."""
+    print(f"{report['operations']} of {report['attempted']} operations completed in {report['elapsed']:.2f} s "
+          f"({report['operations'] / report['elapsed']:.0f} ops/s), all written after {report['flushed']:.2f} s")
+
+    header = " ".join(f"{f'p{percent}':>9}" for percent in PERCENTILES)
+    print(f"{'operation':>12} {'count':>7} {header}   (ms)")
+    for operation, values in report["latencies"].items():
+        columns = " ".join(f"{percentile(values, percent) * 1000:9.3f}" for percent in PERCENTILES)
+        print(f"{operation:>12} {len(values):7d} {columns}")
+
+    mix = ", ".join(f"{operation} {count / max(report['attempted'], 1):.0%} (configured {OPERATION_MIX[operation]:.0%})"
+                    for operation, count in report["performed"].items())
+    print(f"Performed mix: {mix}")
+
+    print(f"Check-in latency by earlier check-ins of the habit, over {report['simulated_days']} simulated days:")
+    print(f"{'history':>12} {'count':>7} {header}   (ms)")
+    for history, values in report["history_latencies"].items():
+        columns = " ".join(f"{percentile(values, percent) * 1000:9.3f}" for percent in PERCENTILES)
+        print(f"{f'{history}-{history + HISTORY_STEP - 1}':>12} {len(values):7d} {columns}")
+
+    print("File sizes:")
+    for file_name, size in sorted(report["file_sizes"].items()):
+        print(f"{file_name:>22}: {size / 1024:10.1f} KiB")
+
+    print(f"Failed operations: {len(report['failures'])}")
+    for description in report["failures"][:20]:
+        print(f"    {description}")
+    print(f"Lost updates: {len(report['lost'])}")
+    for description in report["lost"][:20]:
+        print(f"    {description}")
+
+
+def succeeded(report):
+    """Returns whether every operation completed and no update was lost."""
+    return not report["failures"] and not report["lost"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=8, help="number of concurrent simulated users")
+    parser.add_argument("--tenants", type=int, default=8, help="number of tenants the users are spread over")
+    parser.add_argument("--operations", type=int, default=200, help="number of operations per user")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random operations")
+    parser.add_argument("--max-open", type=int, default=4,
+                        help="maximum number of open tenant stores, below --tenants to exercise eviction")
+    parser.add_argument("--durability", default="deferred", help="durability level of the tenant stores")
+    parser.add_argument("--root", help="data root to use instead of a temporary directory (kept after the run)")
+    args = parser.parse_args()
+
+    options = dict(users=args.users, tenants=args.tenants, operations=args.operations, seed=args.seed,
+                   max_open=args.max_open, durability=args.durability)
+    if args.root:
+        report = run(args.root, **options)
+    else:
+        with tempfile.TemporaryDirectory() as root:
+            report = run(root, **options)
+    print_report(report)
+    if not succeeded(report):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
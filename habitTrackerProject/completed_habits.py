@@ -1,4 +1,5 @@
-from analytics import load_completed_habits
+from archive import CompletedArchive
+from pager import page, paginate
 
 
 def view_completed_habits(completed_habits):
@@ -6,7 +7,8 @@ def view_completed_habits(completed_habits):
     It shows the list of all completed habits.
 
     Args:
-        completed_habits (list): A list of Habit objects that have been completed.
+        completed_habits (CompletedArchive or list): The completed habits archive, or a list of
+            Habit objects that have been completed.
 
     Behavior:
          If there are no habits that are completed, prints an appropriate message.
@@ -18,17 +20,35 @@ def view_completed_habits(completed_habits):
         return
 
     print("Completed Habits:")
-    # Go over all the completed habits and show each with a number.
-    for i, habit in enumerate(completed_habits):
-        print(f"{i + 1}. {habit.name}")
+    # Go over all the completed habits and show each with a number, one page at a time.
+    page(iter_completed_habit_names(completed_habits), numbered=True)
+
+
+def iter_completed_habit_names(completed_habits, offset=0, limit=None):
+    """
+    It yields the names of the completed habits one at a time.
+
+    Args:
+        completed_habits (CompletedArchive or list): The completed habits archive, or a list of
+            Habit objects that have been completed.
+        offset (int): The number of completed habits to skip.
+        limit (int): The maximum number of names to yield, or None for all of them.
+
+    Yields:
+        str: The name of each selected completed habit.
+    """
+    # The archive can list the names straight from its index without loading any check-ins.
+    if isinstance(completed_habits, CompletedArchive):
+        yield from completed_habits.iter_names(offset, limit)
+    else:
+        yield from paginate((habit.name for habit in completed_habits), offset, limit)
 
 
 def main():
     """
     This is the main function used for viewing all completed habits.
 
-    get the list of the completed habits from the analytics module using
-    load_completed_habits(), and then calls view_completed_habits() to output them.
+    opens the completed habits archive and then calls view_completed_habits() to output
+    the names stored in it.
     """
-    completed_habits = load_completed_habits()
-    view_completed_habits(completed_habits)
+    view_completed_habits(CompletedArchive())
@@ -8,10 +8,11 @@ and then remove the habit from the list of active habits and at the same time sa
 
 from habit import Habit
 import json
-from utility import save_habits
+from events import event_bus
+from settings import DATA_DIR
 
 
-def delete_habit(habits):
+def delete_habit(habits, data_dir=DATA_DIR):
     """
     Removes/deletes a chosen habit from the list of current active habits.
 
@@ -25,15 +26,16 @@ def delete_habit(habits):
 
     Args:
         habits (list): list of Habit objects identifying the active habits.
+        data_dir (str): The data directory holding the habit files.
 
     Returns:
-        None
+        Habit: The deleted habit, or None if nothing was deleted.
     """
 
     # Check if there are any habits to delete
     if not habits:
         print("No habits available.")
-        return
+        return None
 
     # I looped until a correct habit number is provided - input validation
     while True:
@@ -64,10 +66,13 @@ def delete_habit(habits):
         else:
             print("Please enter either 'yes' or 'no'.")
 
-    # If the deletion is confirmed, remove the habit and then save the updated list
+    # If the deletion is confirmed, remove the habit, the subscribers of the event save the updated list
     if confirm == "yes":
+        bus = event_bus(habits, data_dir)
         habits.remove(habit)
-        save_habits(habits)
+        bus.emit("habit_deleted", habit.name, habits)
         print(f"The habit '{habit.name}' has been deleted successfully!")
+        return habit
     else:
         print("Deletion cancelled.")
+        return None
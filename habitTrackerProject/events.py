@@ -0,0 +1,261 @@
+"""
+This module provides the in-process event bus of the Habit Tracker.
+
+check_in() and the other commands only change the habits in memory and emit an event. Everything derived
+from the change is done by subscribers:
+    - the storage subscriber saves the habits file and appends completed habits to the archive,
+    - the rollups subscriber updates the precomputed check-in counts,
+    - the change log subscriber records the change for the replicas.
+
+The emitted events are:
+    - "habit_created": a habit was added.
+    - "checked_in": a habit was checked in, with the date of the check-in and whether it was completed.
+    - "goal_completed": a habit reached its goal, with the whole habit as it was completed.
+    - "streak_broken": the streak of a habit broke at a day rollover.
+    - "habit_deleted": a habit was deleted.
+
+On an asynchronous bus every subscriber has its own bounded queue and worker thread, so the cost of emitting
+an event does not depend on the work the subscribers do. When a queue is full, emit() waits until the
+subscriber has caught up (backpressure) instead of dropping events or growing without limit.
+drain() waits until every queued event has been handled, and close() drains and stops the workers.
+
+When no bus was enabled for a data directory, event_bus() returns its synchronous bus, which calls
+the subscribers directly, so scripts and tests see the files updated as soon as a command returns.
+The synchronous bus of a data directory is created on its first use and reused by the later commands.
+"""
+
+import os
+import queue
+import threading
+from dataclasses import dataclass, field
+
+from archive import CompletedArchive
+from habit import Habit, parse_entry_date
+from replication import record_change
+from rollups import Rollups
+from settings import DATA_DIR
+from utility import save_habits
+
+EVENTS = ("habit_created", "checked_in", "goal_completed", "streak_broken", "habit_deleted")
+DEFAULT_QUEUE_SIZE = 1024
+
+# The asynchronous buses that are currently enabled, by absolute path of their data directory.
+_buses = {}
+# The synchronous buses used when no bus is enabled, by absolute path of their data directory.
+_synchronous_buses = {}
+
+
+@dataclass
+class Event:
+    """
+    A change of one habit.
+
+    Args:
+        name (str): One of EVENTS.
+        habit_name (str): The name of the habit that changed.
+        habits (list): The active habits the change was made in.
+        data (dict): The details of the change.
+    """
+    name: str
+    habit_name: str
+    habits: list = None
+    data: dict = field(default_factory=dict)
+
+
+class _Subscriber:
+    """A handler with its own bounded queue and worker thread."""
+
+    def __init__(self, handler, events, queue_size, name):
+        self.handler = handler
+        self.events = set(events)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = threading.Thread(target=self._run, name=f"events-{name}", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            event = self.queue.get()
+            try:
+                if event is None:
+                    return
+                _handle(self.handler, event)
+            finally:
+                self.queue.task_done()
+
+
+def _handle(handler, event):
+    # A failing subscriber must not take the others (or the caller) down with it.
+    try:
+        handler(event)
+    except Exception as error:
+        print(f"Error while handling the '{event.name}' event of '{event.habit_name}': {error}")
+
+
+class EventBus:
+    """
+    Delivers the events to the subscribed handlers.
+
+    Args:
+        queue_size (int): The maximum number of events waiting for each subscriber.
+        asynchronous (bool): Whether the handlers run on worker threads or directly inside emit().
+    """
+
+    def __init__(self, queue_size=DEFAULT_QUEUE_SIZE, asynchronous=True):
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        self.queue_size = queue_size
+        self.asynchronous = asynchronous
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, handler, events=EVENTS, name=None):
+        """
+        Calls a handler for every emitted event of the given names.
+
+        Args:
+            handler (callable): A function called with each Event.
+            events (iterable): The names of the events the handler is interested in.
+            name (str): The name of the subscriber, used for its worker thread.
+        """
+        unknown = set(events) - set(EVENTS)
+        if unknown:
+            raise ValueError(f"Invalid events: {', '.join(sorted(unknown))}")
+        subscriber = _Subscriber(handler, events, self.queue_size, name or handler.__name__) \
+            if self.asynchronous else (handler, set(events))
+        with self._lock:
+            self._subscribers.append(subscriber)
+
+    def emit(self, name, habit_name, habits=None, data=None):
+        """
+        Delivers an event to every subscriber interested in it.
+
+        On an asynchronous bus this only queues the event, waiting if a subscriber's queue is full.
+
+        Args:
+            name (str): One of EVENTS.
+            habit_name (str): The name of the habit that changed.
+            habits (list): The active habits the change was made in.
+            data (dict): The details of the change.
+        """
+        if name not in EVENTS:
+            raise ValueError(f"Invalid event: {name}")
+        event = Event(name, habit_name, habits, data or {})
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            if not self.asynchronous:
+                handler, events = subscriber
+                if name in events:
+                    _handle(handler, event)
+            elif name in subscriber.events:
+                subscriber.queue.put(event)
+
+    def drain(self):
+        """Waits until every event emitted so far has been handled."""
+        if self.asynchronous:
+            for subscriber in list(self._subscribers):
+                subscriber.queue.join()
+
+    def close(self):
+        """Handles the pending events and stops the worker threads."""
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        if self.asynchronous:
+            for subscriber in subscribers:
+                subscriber.queue.put(None)
+            for subscriber in subscribers:
+                subscriber.thread.join()
+        for buses in (_buses, _synchronous_buses):
+            for data_dir, bus in list(buses.items()):
+                if bus is self:
+                    del buses[data_dir]
+
+
+def subscribe_defaults(bus, habits, data_dir=DATA_DIR):
+    """
+    Subscribes the storage, rollups and change log handlers of a data directory to a bus.
+
+    Args:
+        bus (EventBus): The bus to subscribe to.
+        habits (list): The active habits, used to build the rollups if they do not exist yet.
+        data_dir (str): The data directory the handlers write to.
+    """
+    # An asynchronous bus is the only writer of the rollups while it is enabled, so it keeps them in memory and
+    # opens them right away, before a later check-in could be counted twice by a rebuild from the live habits.
+    # A synchronous bus lives as long as the process, while other writers (e.g. replication) may update the file,
+    # so it opens the rollups on every event; as the event is handled while it is emitted, rollups built from the
+    # habits already count it.
+    rollups = Rollups.open(habits, data_dir) if bus.asynchronous else None
+
+    def store(event):
+        if event.name == "goal_completed":
+            # The completed habit is appended to the archive, so older completions are never reloaded.
+            CompletedArchive(data_dir).append(Habit.from_canonical(event.data["habit"]))
+        save_habits(event.habits, data_dir)
+
+    def update_rollups(event):
+        current = rollups
+        if current is None:
+            current = Rollups.open(event.habits, data_dir)
+            if current.rebuilt:
+                current.save()
+                return
+        if event.name == "checked_in":
+            current.record(event.habit_name, parse_entry_date(event.data["date"]))
+        else:
+            current.remove_habit(event.habit_name)
+        current.save()
+
+    def record(event):
+        op = "habit_completed" if event.name == "goal_completed" else event.name
+        record_change(op, event.habit_name, event.data, data_dir)
+
+    bus.subscribe(store, ("habit_created", "checked_in", "goal_completed", "habit_deleted"), "storage")
+    bus.subscribe(update_rollups, ("checked_in", "goal_completed", "habit_deleted"), "rollups")
+    bus.subscribe(record, ("habit_created", "checked_in", "goal_completed", "habit_deleted"), "changelog")
+
+
+def enable_event_bus(habits, data_dir=DATA_DIR, queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    Handles the events of a data directory on an asynchronous bus with the default subscribers.
+
+    Args:
+        habits (list): The active habits of the data directory.
+        data_dir (str): The data directory.
+        queue_size (int): The maximum number of events waiting for each subscriber.
+
+    Returns:
+        EventBus: The bus, which must be drained or closed before the program exits.
+    """
+    bus = EventBus(queue_size)
+    subscribe_defaults(bus, habits, data_dir)
+    _buses[os.path.abspath(data_dir)] = bus
+    # The synchronous bus would keep counting on rollups that the new bus now updates.
+    _synchronous_buses.pop(os.path.abspath(data_dir), None)
+    return bus
+
+
+def event_bus(habits, data_dir=DATA_DIR):
+    """
+    Returns the bus handling the events of a data directory.
+
+    Args:
+        habits (list): The active habits of the data directory.
+        data_dir (str): The data directory.
+
+    Returns:
+        EventBus: The enabled asynchronous bus, or else the synchronous bus with the default subscribers.
+    """
+    key = os.path.abspath(data_dir)
+    bus = _buses.get(key) or _synchronous_buses.get(key)
+    if bus is None:
+        bus = EventBus(asynchronous=False)
+        subscribe_defaults(bus, habits, data_dir)
+        _synchronous_buses[key] = bus
+    return bus
+
+
+def drain():
+    """Waits until every enabled bus has handled the events emitted so far."""
+    for bus in list(_buses.values()):
+        bus.drain()
@@ -0,0 +1,192 @@
+"""
+This module exports the check-ins in a flat, columnar form for offline analysis.
+
+Instead of the nested tracked_data of every habit, the export has one row per check-in with the columns:
+    - habit_id: the name of the habit, which identifies it within a data directory,
+    - status: "active" or "completed",
+    - periodicity: "daily" or "weekly",
+    - date: the day of the check-in,
+    - day_ordinal: the proleptic Gregorian ordinal of that day (date.toordinal()), for cheap date arithmetic,
+    - period_key: the day ("2025-01-10") of a daily habit, or the ISO week ("2025-W02") of a weekly habit,
+    - streak_at_check_in: the run streak reached with this check-in,
+    - current_streak: the active streak of the habit today,
+    - best_streak: the longest run streak the habit ever reached.
+
+Check-ins compacted by the retention policy are only in the cold history file, so they have no rows,
+but the streak columns still take them into account.
+
+The rows are streamed habit by habit and written in chunks of a bounded number of rows, either as
+numbered CSV files or, when pyarrow is installed, as record batches of a single Arrow IPC file.
+
+Run it from the project directory with:
+    python export.py --output export
+"""
+
+import argparse
+import csv
+import os
+from itertools import islice
+
+from analytics import get_best_streak, get_current_streak, iter_streak_runs
+from archive import CompletedArchive
+from rollups import bucket_keys
+from settings import DATA_DIR
+from utility import load_habits
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+COLUMNS = ("habit_id", "status", "periodicity", "date", "day_ordinal", "period_key",
+           "streak_at_check_in", "current_streak", "best_streak")
+CHUNK_ROWS = 100_000
+
+
+def iter_check_in_rows(habits, completed=(), today=None):
+    """
+    Yields one row per check-in of the active and the completed habits.
+
+    Args:
+        habits (iterable): The active Habit objects.
+        completed (iterable): The completed Habit objects, e.g. a CompletedArchive.
+        today (datetime.date): The date the current streaks are evaluated on, defaults to the current date.
+
+    Yields:
+        tuple: The values of the row, in the order of COLUMNS.
+    """
+    for status, status_habits in (("active", habits), ("completed", completed)):
+        for habit in status_habits:
+            bucket = "week" if habit.periodicity == "weekly" else "day"
+            runs = list(iter_streak_runs(habit))
+            if not runs:
+                continue
+            current_streak = get_current_streak(habit, today)
+            best_streak = get_best_streak(habit)
+            for date, streak in runs:
+                yield (habit.name, status, habit.periodicity, date, date.toordinal(), bucket_keys(date)[bucket],
+                       streak, current_streak, best_streak)
+
+
+def iter_chunks(rows, chunk_rows=CHUNK_ROWS):
+    """
+    Splits the rows into lists of at most chunk_rows rows.
+
+    Args:
+        rows (iterable): The rows to split.
+        chunk_rows (int): The maximum number of rows per chunk.
+
+    Yields:
+        list: Each chunk of rows.
+    """
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be at least 1")
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_rows))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_csv(rows, output_dir, chunk_rows=CHUNK_ROWS):
+    """
+    Writes the rows to numbered CSV files with a header, one file per chunk.
+
+    Args:
+        rows (iterable): The rows from iter_check_in_rows().
+        output_dir (str): The directory the files are written to, created if needed.
+        chunk_rows (int): The maximum number of rows per file.
+
+    Returns:
+        list: The paths of the written files.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for number, chunk in enumerate(iter_chunks(rows, chunk_rows)):
+        path = os.path.join(output_dir, f"check_ins-{number:05d}.csv")
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(COLUMNS)
+            writer.writerows(chunk)
+        paths.append(path)
+    return paths
+
+
+def write_arrow(rows, output_dir, chunk_rows=CHUNK_ROWS):
+    """
+    Writes the rows to an Arrow IPC file, one record batch per chunk. Requires pyarrow.
+
+    Args:
+        rows (iterable): The rows from iter_check_in_rows().
+        output_dir (str): The directory the file is written to, created if needed.
+        chunk_rows (int): The maximum number of rows per record batch.
+
+    Returns:
+        list: The path of the written file.
+    """
+    if pyarrow is None:
+        raise RuntimeError("The Arrow export requires pyarrow, which is not installed.")
+
+    schema = pyarrow.schema([
+        ("habit_id", pyarrow.string()),
+        ("status", pyarrow.string()),
+        ("periodicity", pyarrow.string()),
+        ("date", pyarrow.date32()),
+        ("day_ordinal", pyarrow.int32()),
+        ("period_key", pyarrow.string()),
+        ("streak_at_check_in", pyarrow.int32()),
+        ("current_streak", pyarrow.int32()),
+        ("best_streak", pyarrow.int32()),
+    ])
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, "check_ins.arrow")
+    with pyarrow.ipc.new_file(path, schema) as writer:
+        for chunk in iter_chunks(rows, chunk_rows):
+            columns = [pyarrow.array(values, type=schema.field(position).type)
+                       for position, values in enumerate(zip(*chunk))]
+            writer.write_batch(pyarrow.record_batch(columns, schema=schema))
+    return [path]
+
+
+def export_check_ins(output_dir, data_dir=DATA_DIR, file_format="auto", chunk_rows=CHUNK_ROWS, today=None):
+    """
+    Exports the check-ins of the active and completed habits of a data directory.
+
+    Args:
+        output_dir (str): The directory the files are written to.
+        data_dir (str): The data directory holding the habits.
+        file_format (str): "csv", "arrow", or "auto" for Arrow when pyarrow is installed and CSV otherwise.
+        chunk_rows (int): The maximum number of rows per CSV file or Arrow record batch.
+        today (datetime.date): The date the current streaks are evaluated on, defaults to the current date.
+
+    Returns:
+        list: The paths of the written files.
+    """
+    if file_format == "auto":
+        file_format = "arrow" if pyarrow is not None else "csv"
+    if file_format not in ("csv", "arrow"):
+        raise ValueError(f"Invalid export format: {file_format}")
+
+    # An export only reads the data directory, so old files are migrated in memory and left as they are.
+    rows = iter_check_in_rows(load_habits(data_dir, read_only=True), CompletedArchive(data_dir, read_only=True),
+                              today)
+    write = write_arrow if file_format == "arrow" else write_csv
+    return write(rows, output_dir, chunk_rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the check-ins as flat CSV or Arrow files.")
+    parser.add_argument("--output", default="export", help="directory the files are written to")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="data directory holding the habits")
+    parser.add_argument("--format", default="auto", choices=("auto", "csv", "arrow"), help="file format")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows per file or record batch")
+    args = parser.parse_args()
+
+    for path in export_check_ins(args.output, args.data_dir, args.format, args.chunk_rows):
+        print(f"Written {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,33 @@
 import datetime
 import json
-from dataclasses import dataclass, field, asdict
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+
+
+@lru_cache(maxsize=8192)
+def parse_entry_date(date_str):
+    """
+    Parses the date of a tracked_data entry, which may or may not include the time.
+
+    Every stored date starts with the fixed-width "YYYY-MM-DD" part, so the fast path slices
+    the first ten characters and hands them to date.fromisoformat, no matter whether a time follows.
+    Only dates written in another form fall back to strptime. The results are cached, since the same
+    date strings are parsed again by every analytics function.
+
+    Args:
+        date_str (str): A date string like "2025-01-10 08:00:00" or "2025-01-10".
+
+    Returns:
+        datetime.date: The parsed date.
+    """
+    try:
+        return datetime.date.fromisoformat(date_str[:10])
+    except ValueError:
+        try:
+            return datetime.datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S").date()
+        except ValueError:
+            return datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
 
 
 @dataclass
@@ -14,6 +41,8 @@ class Habit:
     # the current date and time when a new Habit is instantiated.
     creation_date: str = field(default_factory=lambda: datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
     tracked_data: list = field(default_factory=list)
+    # The aggregates of the check-ins moved out of tracked_data by the retention policy, see the retention module.
+    compacted: dict = field(default_factory=dict)
 
     def add_tracked_data(self, completion_time: str):
         """
@@ -39,27 +68,20 @@ class Habit:
         """
         Converts the Habit instance into a dictionary for JSON serialization.
 
-        This method uses asdict() to transform the dataclass into a dictionary.
-        It also ensures that tracked_data is always a list of dictionaries with a string-formatted "date".
+        The habits in memory are always in the canonical form (old files are normalised once by
+        the migrations module when they are loaded), so the fields are copied without any repair.
+        Only the tracked_data entries and the compacted aggregates are copied, so the dictionary
+        does not share them with the Habit.
 
         Returns:
              dict: A dictionary representation of the Habit.
         """
-
-        data = asdict(self)
-
-        # Here, I am just making sure that tracked_data is a list.
-        if not isinstance(data["tracked_data"], list):
-            data["tracked_data"] = []
-
-        # Then I Processed each entry in the tracked_data to make sure of appropriate formatting.
-        for entry in data["tracked_data"]:
-            if isinstance(entry, dict):
-                entry["date"] = str(entry.get("date", ""))
-            else:
-                print(f"Invalid tracked_data entry found: {entry}")
-                data["tracked_data"] = []
-
+        data = {habit_field.name: getattr(self, habit_field.name) for habit_field in fields(self)}
+        data["tracked_data"] = [dict(entry) for entry in self.tracked_data]
+        if self.compacted:
+            data["compacted"] = dict(self.compacted, counts=dict(self.compacted["counts"]))
+        else:
+            data["compacted"] = {}
         return data
 
     @classmethod
@@ -97,9 +119,143 @@ class Habit:
             progress=data.get("progress", 0),
             description=data.get("description", ""),
             creation_date=data.get("creation_date", ""),
-            tracked_data=tracked_data
+            tracked_data=tracked_data,
+            compacted=data.get("compacted") or {}
         )
 
+    @classmethod
+    def from_canonical(cls, data):
+        """
+        Creation of the Habit instance from a dictionary that is known to be in the canonical form.
+
+        This is the fast path used for files written with the current schema version,
+        it skips all the checks done by from_dict().
+
+        Args:
+            data (dict): A dictionary written by to_dict().
+
+        Returns:
+            Habit: A newly created Habit instance from the provided data.
+        """
+        return cls(**data)
+
     def is_completed(self):
         """Checks if the habit goal has been reached."""
         return self.progress >= self.goal
+
+    def date_index(self):
+        """
+        Returns the sorted list of check-in dates of the habit.
+
+        The index is cached on the instance and only rebuilt when the number of tracked entries changes,
+        so repeated range queries do not re-parse and re-sort the whole history.
+        The check-ins compacted by the retention policy are not part of the index.
+
+        Returns:
+            list: The sorted datetime.date objects of all valid tracked entries.
+        """
+        cached = getattr(self, "_date_index", None)
+        if cached is not None and cached[0] == len(self.tracked_data):
+            return cached[1]
+
+        dates = sorted(
+            parse_entry_date(entry["date"])
+            for entry in self.tracked_data
+            if isinstance(entry, dict) and "date" in entry
+        )
+        self._date_index = (len(self.tracked_data), dates)
+        return dates
+
+    def last_check_in(self):
+        """
+        Returns the date of the latest check-in, including the check-ins moved out by the retention policy.
+
+        Returns:
+            datetime.date: The latest check-in date, or None if the habit was never checked in.
+        """
+        dates = self.date_index()
+        if dates:
+            return dates[-1]
+        if self.compacted:
+            return parse_entry_date(self.compacted["last_date"])
+        return None
+
+    def checked_in_during_period(self, day):
+        """
+        Checks whether the habit already has a check-in in the period of a day.
+
+        The period is the day itself for daily habits and its ISO week for weekly habits.
+        The last compacted check-in day is taken into account too.
+
+        Args:
+            day (datetime.date): A day of the period.
+
+        Returns:
+            bool: True if there is a check-in within the period.
+        """
+        if self.periodicity == "weekly":
+            start = day - datetime.timedelta(days=day.weekday())
+            end = start + datetime.timedelta(days=6)
+        else:
+            start = end = day
+        if self.compacted and start <= parse_entry_date(self.compacted["last_date"]) <= end:
+            return True
+        return self.count_check_ins_between(start, end) > 0
+
+    def check_ins_between(self, start, end):
+        """
+        Returns the check-in dates that fall within a date range, found by bisecting the date index.
+
+        Args:
+            start (datetime.date): The first day of the range (inclusive).
+            end (datetime.date): The last day of the range (inclusive).
+
+        Returns:
+            list: The sorted check-in dates within the range.
+        """
+        dates = self.date_index()
+        return dates[bisect_left(dates, start):bisect_right(dates, end)]
+
+    def count_check_ins_between(self, start, end):
+        """
+        Counts the check-ins within a date range without building the list of dates.
+
+        Args:
+            start (datetime.date): The first day of the range (inclusive).
+            end (datetime.date): The last day of the range (inclusive).
+
+        Returns:
+            int: The number of check-ins within the range.
+        """
+        dates = self.date_index()
+        return bisect_right(dates, end) - bisect_left(dates, start)
+
+    def completion_ratio_between(self, start, end):
+        """
+        Calculates the share of periods within a date range that have at least one check-in.
+
+        For daily habits every day of the range is a period, for weekly habits every ISO week
+        the range touches is a period.
+
+        Args:
+            start (datetime.date): The first day of the range (inclusive).
+            end (datetime.date): The last day of the range (inclusive).
+
+        Returns:
+            float: The completion ratio between 0.0 and 1.0, or 0.0 for an empty range.
+        """
+        if end < start:
+            return 0.0
+
+        dates = self.check_ins_between(start, end)
+        if self.periodicity == "weekly":
+            checked_periods = {date.isocalendar()[:2] for date in dates}
+            # Count the ISO weeks touched by the range using the Mondays of the first and last week.
+            first_monday = start - datetime.timedelta(days=start.weekday())
+            last_monday = end - datetime.timedelta(days=end.weekday())
+            total_periods = (last_monday - first_monday).days // 7 + 1
+        else:
+            checked_periods = set(dates)
+            total_periods = (end - start).days + 1
+
+        return len(checked_periods) / total_periods
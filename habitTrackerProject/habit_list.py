@@ -0,0 +1,303 @@
+"""
+This module provides the container of the active habits.
+
+HabitList behaves like the plain list of Habit objects used everywhere else, but it also keeps
+secondary indexes by periodicity, by status, by reached goal, by creation date and by name, together with the streak
+leaderboard.
+Adding and removing habits updates the indexes automatically; after a habit was checked in,
+refresh(habit) updates them for that habit only. Filtered listings and counts then cost
+O(result) instead of a scan over every habit and its history.
+
+Since a streak breaks when its deadline passes, the habits are also kept in a priority queue ordered
+by the day their streak breaks. advance_day() only updates the habits whose deadline has passed.
+"""
+
+import datetime
+import heapq
+import threading
+from bisect import bisect_left, insort
+
+from analytics import get_days
+from leaderboard import StreakLeaderboard
+from search import NameIndex
+
+STATUSES = ("active", "broken")
+
+
+def streak_deadline(habit):
+    """
+    Returns the first day on which the streak of a habit counts as broken.
+
+    Args:
+        habit (Habit): The habit to get the deadline of.
+
+    Returns:
+        datetime.date: The day the streak breaks, or None for habits without check-ins.
+    """
+    last_check_in = habit.last_check_in()
+    if last_check_in is None:
+        return None
+    return last_check_in + datetime.timedelta(days=get_days(habit.periodicity) + 1)
+
+
+def habit_status(habit, today=None):
+    """
+    Returns the streak status of a habit.
+
+    A habit is "broken" if its last check-in is further in the past than its periodicity allows, and "active"
+    otherwise (including habits without any check-in yet). The status only depends on the check-in dates;
+    whether the goal is reached is told by goal_reached().
+
+    Args:
+        habit (Habit): The habit to get the status of.
+        today (datetime.date): The date the status is evaluated on, defaults to the current date.
+
+    Returns:
+        str: One of STATUSES.
+    """
+    if today is None:
+        today = datetime.datetime.now().date()
+    last_check_in = habit.last_check_in()
+    if last_check_in is not None and (today - last_check_in).days > get_days(habit.periodicity):
+        return "broken"
+    return "active"
+
+
+def goal_reached(habit):
+    """
+    Checks if a habit has reached its goal. A habit without a positive goal has no goal to reach.
+
+    Args:
+        habit (Habit): The habit to check.
+
+    Returns:
+        bool: True if the goal is positive and the progress reached it.
+    """
+    return habit.goal > 0 and habit.is_completed()
+
+
+class HabitList(list):
+    """
+    A list of Habit objects with secondary indexes.
+
+    The indexes map each periodicity and each status to the habits in it (in insertion order),
+    and keep (creation_date, name) pairs sorted for listing the habits by creation date.
+    The indexes are guarded by a lock, so a background scheduler can call advance_day().
+
+    Args:
+        habits (iterable): The initial Habit objects.
+    """
+
+    def __init__(self, habits=()):
+        super().__init__(habits)
+        self._lock = threading.RLock()
+        self._rebuild_indexes()
+
+    def append(self, habit):
+        super().append(habit)
+        self._index(habit)
+
+    def extend(self, habits):
+        for habit in habits:
+            self.append(habit)
+
+    def __iadd__(self, habits):
+        self.extend(habits)
+        return self
+
+    def insert(self, position, habit):
+        super().insert(position, habit)
+        self._index(habit)
+
+    def remove(self, habit):
+        super().remove(habit)
+        self._unindex(habit)
+
+    def pop(self, position=-1):
+        habit = super().pop(position)
+        self._unindex(habit)
+        return habit
+
+    def clear(self):
+        super().clear()
+        self._rebuild_indexes()
+
+    def __setitem__(self, position, value):
+        super().__setitem__(position, value)
+        self._rebuild_indexes()
+
+    def __delitem__(self, position):
+        super().__delitem__(position)
+        self._rebuild_indexes()
+
+    def refresh(self, habit, today=None):
+        """
+        Updates the status and the streak of one habit after it was checked in.
+
+        Args:
+            habit (Habit): The habit that changed.
+            today (datetime.date): The date the status is evaluated on, defaults to the current date.
+        """
+        with self._lock:
+            key = id(habit)
+            if key not in self._habits_by_id:
+                return
+            for habits in self._by_status.values():
+                habits.pop(key, None)
+            self._by_status[habit_status(habit, today)][key] = habit
+            self._update_goal_reached(habit)
+            self.leaderboard.update(habit, today)
+            self._schedule(habit)
+
+    def advance_day(self, today=None):
+        """
+        Marks the streaks whose deadline has passed as broken.
+
+        Only the habits at the front of the deadline queue are looked at, so the cost depends on
+        the number of streaks that broke, not on the number of habits.
+
+        Args:
+            today (datetime.date): The new current date, defaults to the current date.
+
+        Returns:
+            list: The habits whose streak broke.
+        """
+        if today is None:
+            today = datetime.datetime.now().date()
+
+        broken = []
+        with self._lock:
+            self.built_on = today
+            while self._deadlines and self._deadlines[0][0] <= today:
+                deadline, key = heapq.heappop(self._deadlines)
+                # Entries are left in the queue when a check-in moves the deadline, so skip the outdated ones.
+                if self._deadline_of.get(key) != deadline:
+                    continue
+                del self._deadline_of[key]
+                habit = self._habits_by_id[key]
+                for habits in self._by_status.values():
+                    habits.pop(key, None)
+                self._by_status["broken"][key] = habit
+                self.leaderboard.set_streak(habit, 0)
+                broken.append(habit)
+        return broken
+
+    def find(self, habit_name):
+        """
+        Looks up a habit by name, ignoring the case.
+
+        Args:
+            habit_name (str): The name of the habit.
+
+        Returns:
+            Habit: The habit, or None if there is no habit with that name.
+        """
+        with self._lock:
+            return self._names.find(habit_name)
+
+    def complete(self, prefix, limit=5):
+        """Returns up to limit habit names starting with the prefix, for autocompletion."""
+        with self._lock:
+            return self._names.complete(prefix, limit)
+
+    def suggest(self, habit_name, limit=3):
+        """Returns up to limit habit names similar to a possibly mistyped name."""
+        with self._lock:
+            return self._names.suggest(habit_name, limit)
+
+    def by_periodicity(self, periodicity):
+        """Returns the habits with the given periodicity."""
+        with self._lock:
+            return list(self._by_periodicity.get(periodicity, {}).values())
+
+    def by_status(self, status):
+        """Returns the habits with the given status, see STATUSES."""
+        with self._lock:
+            return list(self._by_status.get(status, {}).values())
+
+    def by_goal_reached(self):
+        """Returns the habits that reached their goal, see goal_reached()."""
+        with self._lock:
+            return list(self._goal_reached.values())
+
+    def by_creation_date(self):
+        """Returns the habits ordered from the oldest to the newest creation date."""
+        with self._lock:
+            return [self._habits_by_id[key] for _, _, key in self._by_creation]
+
+    def next_deadline(self):
+        """Returns the earliest day on which a streak breaks, or None if no streak can break."""
+        with self._lock:
+            while self._deadlines and self._deadline_of.get(self._deadlines[0][1]) != self._deadlines[0][0]:
+                heapq.heappop(self._deadlines)
+            return self._deadlines[0][0] if self._deadlines else None
+
+    def count_by_periodicity(self, periodicity):
+        """Returns the number of habits with the given periodicity."""
+        return len(self._by_periodicity.get(periodicity, {}))
+
+    def count_by_status(self, status):
+        """Returns the number of habits with the given status."""
+        return len(self._by_status.get(status, {}))
+
+    def _rebuild_indexes(self):
+        with self._lock:
+            self.built_on = datetime.datetime.now().date()
+            self._habits_by_id = {}
+            self._by_periodicity = {}
+            self._by_status = {status: {} for status in STATUSES}
+            self._goal_reached = {}
+            self._by_creation = []
+            self._names = NameIndex()
+            self._deadlines = []
+            self._deadline_of = {}
+            self.leaderboard = StreakLeaderboard()
+            for habit in self:
+                self._index(habit)
+
+    def _index(self, habit):
+        with self._lock:
+            key = id(habit)
+            self._habits_by_id[key] = habit
+            self._by_periodicity.setdefault(habit.periodicity, {})[key] = habit
+            self._by_status[habit_status(habit, self.built_on)][key] = habit
+            self._update_goal_reached(habit)
+            insort(self._by_creation, (habit.creation_date, habit.name, key))
+            self._names.add(habit)
+            self.leaderboard.update(habit, self.built_on)
+            self._schedule(habit)
+
+    def _unindex(self, habit):
+        with self._lock:
+            key = id(habit)
+            # When the same habit object was added twice, it stays indexed until its last copy is removed.
+            if any(item is habit for item in self):
+                return
+            self._habits_by_id.pop(key, None)
+            self._by_periodicity.get(habit.periodicity, {}).pop(key, None)
+            for habits in self._by_status.values():
+                habits.pop(key, None)
+            self._goal_reached.pop(key, None)
+            position = bisect_left(self._by_creation, (habit.creation_date, habit.name, key))
+            if position < len(self._by_creation) and self._by_creation[position][2] == key:
+                del self._by_creation[position]
+            self._deadline_of.pop(key, None)
+            self._names.remove(habit)
+            self.leaderboard.remove(habit)
+
+    def _update_goal_reached(self, habit):
+        key = id(habit)
+        if goal_reached(habit):
+            self._goal_reached[key] = habit
+        else:
+            self._goal_reached.pop(key, None)
+
+    def _schedule(self, habit):
+        """Queues the habit under the day its streak breaks, unless it is already broken."""
+        key = id(habit)
+        deadline = streak_deadline(habit)
+        if deadline is None or deadline <= self.built_on:
+            self._deadline_of.pop(key, None)
+            return
+        self._deadline_of[key] = deadline
+        heapq.heappush(self._deadlines, (deadline, key))
@@ -0,0 +1,110 @@
+"""
+This module keeps a leaderboard of the longest active streaks.
+
+The leaderboard holds the active streak of every habit in sorted lists, one over all habits
+and one per periodicity. It is updated one habit at a time as check-ins arrive and habits are
+added or deleted, so the menu can read the top streaks without recomputing the streak of every habit.
+"""
+
+from bisect import bisect_left, insort
+
+from analytics import get_current_streak
+
+
+class StreakLeaderboard:
+    """
+    Sorted leaderboards of the active streaks, overall and per periodicity.
+
+    The habits are ranked by object, like the indexes of HabitList, since two habits may share a name.
+    The rankings are lists of (-streak, habit name, habit id) tuples kept in sorted order, so the longest
+    streak is always the first entry, ties are ordered by name, and the top K streaks are the first K entries.
+    Habits without an active streak are not ranked.
+
+    Args:
+        habits (list): The Habit objects to rank initially.
+    """
+
+    def __init__(self, habits=()):
+        # The streak, periodicity, display name and the habit itself, by id(habit).
+        # Holding the habit keeps its id from being reused while it is ranked.
+        self._streaks = {}
+        self._ranking = []
+        self._by_periodicity = {}
+        for habit in habits:
+            self.update(habit)
+
+    def __len__(self):
+        return len(self._ranking)
+
+    def update(self, habit, today=None):
+        """
+        Recomputes the streak of a single habit and moves it to its new place.
+
+        This is called after the habit was added or checked in.
+
+        Args:
+            habit (Habit): The habit whose streak may have changed.
+            today (datetime.date): The date the streak is evaluated on, defaults to the current date.
+        """
+        self.set_streak(habit, get_current_streak(habit, today))
+
+    def set_streak(self, habit, streak):
+        """
+        Stores an already computed streak of a habit.
+
+        Args:
+            habit (Habit): The habit.
+            streak (int): The active streak of the habit.
+        """
+        self.remove(habit)
+        key = id(habit)
+        self._streaks[key] = (streak, habit.periodicity, habit.name, habit)
+        if streak > 0:
+            insort(self._ranking, (-streak, habit.name, key))
+            insort(self._by_periodicity.setdefault(habit.periodicity, []), (-streak, habit.name, key))
+
+    def remove(self, habit):
+        """
+        Takes a deleted or completed habit off the leaderboard.
+
+        Args:
+            habit (Habit): The habit.
+        """
+        key = id(habit)
+        if key not in self._streaks:
+            return
+        streak, periodicity, habit_name, _ = self._streaks.pop(key)
+        if streak > 0:
+            for ranking in (self._ranking, self._by_periodicity[periodicity]):
+                del ranking[bisect_left(ranking, (-streak, habit_name, key))]
+
+    def streak(self, habit):
+        """Returns the ranked streak of a habit, or 0 if the habit is not on the leaderboard."""
+        return self._streaks.get(id(habit), (0,))[0]
+
+    def max(self):
+        """Returns the longest active streak, or 0 if no habit has an active streak."""
+        return -self._ranking[0][0] if self._ranking else 0
+
+    def top(self, k=10, periodicity=None):
+        """
+        Returns the habits with the longest active streaks.
+
+        Args:
+            k (int): The number of habits to return.
+            periodicity (str): Only rank the habits of this periodicity, or None for all habits.
+
+        Returns:
+            list: Up to k (habit name, streak) tuples, longest streak first.
+        """
+        ranking = self._ranking if periodicity is None else self._by_periodicity.get(periodicity, [])
+        return [(habit_name, -negative_streak) for negative_streak, habit_name, _ in ranking[:k]]
+
+    def longest(self):
+        """Returns the names of all habits tied for the longest active streak."""
+        longest = []
+        for negative_streak, habit_name, _ in self._ranking:
+            if negative_streak != self._ranking[0][0]:
+                break
+            longest.append(habit_name)
+        return longest
@@ -1,39 +1,31 @@
 import datetime
-import json
 import os
+import signal
+import sys
 
 from completed_habits import view_completed_habits
 from habit import Habit
 from analytics import (
-    get_all_habits,
-    get_habits_by_periodicity,
-    get_longest_run_streak,
     get_longest_run_streak_for_habit,
-    get_habits_with_broken_streak,
-    get_habits_with_longest_streak,
+    iter_all_habits,
+    iter_activities,
     check_in,
-    progress_summary,
-    load_completed_habits
+    progress_summary
 )
-from utility import save_habits, save_completed_habits
+from archive import CompletedArchive
+from habit_list import HabitList
+from pager import page
+from scheduler import DayRolloverScheduler
+from events import drain, enable_event_bus, event_bus
+from retention import apply_retention
+from rollups import Rollups
+from settings import DATA_DIR
+from migrations import migrate_file
+from utility import habits_file, load_habits, enable_write_behind
 from erase import delete_habit
 
-HABIT_FILE = "data/habits.json"
 
-
-def load_habits():
-    """Loads habits from a JSON file."""
-    if not os.path.exists(HABIT_FILE):
-        return []
-    with open(HABIT_FILE, "r") as file:
-        try:
-            data = json.load(file)
-            return [Habit.from_dict(habit) for habit in data]
-        except json.JSONDecodeError:
-            return []
-
-
-def add_habit(habits):
+def add_habit(habits, data_dir=DATA_DIR):
     """
     Prompts the user to add a new habit and appends it to the habits list.
 
@@ -43,6 +35,7 @@ def add_habit(habits):
 
     Args:
         habits (list): The list of existing Habit objects.
+        data_dir (str): The data directory to save the habits in.
     """
     
     name = input("Enter the name of the new habit: ").strip()
@@ -66,9 +59,10 @@ def add_habit(habits):
 
     new_habit = Habit(name, periodicity, goal, 0, description)
     if not hasattr(new_habit, 'creation_date') or new_habit.creation_date is None:
-        new_habit.creation_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        new_habit.creation_date = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    bus = event_bus(habits, data_dir)
     habits.append(new_habit)
-    save_habits(habits)
+    bus.emit("habit_created", new_habit.name, habits, {"habit": new_habit.to_dict()})
     print("New habit created successfully!")
 
 
@@ -88,8 +82,7 @@ def view_activities(habits):
         return
 
     print("Select a habit to view activities:")
-    for i, habit in enumerate(habits, start=1):
-        print(f"{i}. {habit.name}")
+    page(iter_all_habits(habits), numbered=True)
 
     try:
         choice = int(input("Enter the number of the habit: ")) - 1
@@ -107,22 +100,80 @@ def view_activities(habits):
         print("No recorded activities for this habit.")
         return
 
-    for entry in selected_habit.tracked_data:
-        if isinstance(entry, dict) and "date" in entry:
-            print(f"- {entry['date']}")
-        else:
-            print(f"Skipping invalid entry: {entry}")
+    page(iter_activities(selected_habit))
+
+
+def print_not_found(habits, habit_name, message):
+    """
+    Prints that a habit was not found, followed by the closest habit names if there are any.
+
+    Args:
+        habits (HabitList): The active habits.
+        habit_name (str): The name the user typed.
+        message (str): The message to print first.
+    """
+    print(message)
+    suggestions = habits.complete(habit_name) or habits.suggest(habit_name)
+    if suggestions:
+        print(f"Did you mean: {', '.join(suggestions)}?")
+
+
+def prepare_for_writes(habits, data_dir=DATA_DIR):
+    """
+    Prepares the data directory before the first change of a session is saved.
+
+    A session that only views the habits leaves the files as they are. Before the first change, a habits file
+    with an older schema version is migrated (keeping a backup) and the check-ins older than the retention
+    horizon are compacted.
+
+    Args:
+        habits (list): The active Habit objects.
+        data_dir (str): The data directory holding the habits.
+    """
+    if os.path.exists(habits_file(data_dir)):
+        migrate_file(habits_file(data_dir))
+    apply_retention(habits, data_dir)
 
 
 def main():
     """
     Main function for the Habit Tracker application.
 
+    Loads the habits without changing their file, enables the write-behind saving of the habits file and the event bus whose subscribers
+    save the changes, starts the background job that updates the broken streaks at midnight and runs the menu.
+    The durability level can be chosen with the HABIT_TRACKER_DURABILITY environment variable
+    ("fsync", "write" or "deferred"). Pending changes are written on exit, including on Ctrl+C and SIGTERM.
+    """
+    habits = HabitList(load_habits(read_only=True))
+    writer = enable_write_behind(durability=os.environ.get("HABIT_TRACKER_DURABILITY", "deferred"))
+    bus = enable_event_bus(habits)
+    scheduler = DayRolloverScheduler(habits, bus=bus).start()
+    signal.signal(signal.SIGTERM, exit_on_signal)
+
+    try:
+        run_menu(habits, scheduler)
+    finally:
+        # However the session ends, the pending changes are written before exiting.
+        scheduler.stop()
+        bus.close()
+        writer.close()
+
+
+def exit_on_signal(signum, frame):
+    """Turns a termination signal into a normal exit, so the pending changes are flushed."""
+    sys.exit(0)
+
+
+def run_menu(habits, scheduler):
+    """
     Continuously displays the menu, handles user input with validation,
     and calls appropriate functions based on the user's choice.
-    """
-    habits = load_habits()
 
+    Args:
+        habits (HabitList): The active Habit objects with their indexes and streak leaderboard.
+        scheduler (DayRolloverScheduler): The scheduler breaking the streaks of the habits.
+    """
+    prepared = False
     while True:
         print("\nHabit Tracker Menu\n")
         print("1. Create new habit")
@@ -146,21 +197,33 @@ def main():
             print("Invalid choice. Please re-enter a number between 1 and 13.")
             continue
 
+        # The scheduler updates the statuses at midnight; this only catches up if it could not run,
+        # for example while the computer was suspended.
+        scheduler.catch_up()
+
+        # Creating, checking in and deleting change the files, which are prepared for it once per session.
+        if choice in ["1", "9", "11"] and not prepared:
+            prepare_for_writes(habits)
+            prepared = True
+
         if choice == "1":
             add_habit(habits)
         elif choice == "2":
             print("All Habits:")
-            for habit in get_all_habits(habits):
-                print(f"- {habit}")
+            page(iter_all_habits(habits))
         elif choice == "3":
             periodicity = input("Enter periodicity (daily/weekly): ").strip().lower()
             if periodicity not in ["daily", "weekly"]:
                 print("Invalid periodicity. Please enter 'daily' or 'weekly'.")
                 continue
-            filtered_habits = get_habits_by_periodicity(habits, periodicity)
-            print(f"Habits ({periodicity}):", *filtered_habits, sep="\n- ")
+            print(f"Habits ({periodicity}):")
+            page(habit.name for habit in habits.by_periodicity(periodicity))
         elif choice == "4":
-            print(f"Longest streak: {get_longest_run_streak(habits)}")
+            print(f"Longest streak: {habits.leaderboard.max()}")
+            top_streaks = habits.leaderboard.top(10)
+            if top_streaks:
+                print("Top streaks:")
+                page(f"{name}: {streak}" for name, streak in top_streaks)
         elif choice == "5":
             while True:
                 habit_name = input("Enter habit name: ").strip()
@@ -169,22 +232,22 @@ def main():
                     continue
                 if habit_name.isdigit():
                     print("Invalid input, enter a valid habit name (non-numeric).")
-                elif not any(habit.name.lower() == habit_name.lower() for habit in habits):
-                    print(f"Habit '{habit_name}' not found. Please try again.")
+                elif habits.find(habit_name) is None:
+                    print_not_found(habits, habit_name, f"Habit '{habit_name}' not found. Please try again.")
                 else:
-                    for habit in habits:
-                        if habit.name.lower() == habit_name.lower():
-                            print(
-                                f"Longest streak for '{habit.name}': {get_longest_run_streak_for_habit(habits, habit.name)}"
-                            )
-                            break
+                    habit = habits.find(habit_name)
+                    print(
+                        f"Longest streak for '{habit.name}': {get_longest_run_streak_for_habit(habits, habit.name)}"
+                    )
                     break
         elif choice == "6":
             view_activities(habits)
         elif choice == "7":
-            print("Broken streak habits:", *get_habits_with_broken_streak(habits), sep="\n- ")
+            print("Broken streak habits:")
+            page(habit.name for habit in habits.by_status("broken"))
         elif choice == "8":
-            print("Habits with active longest streak:", *get_habits_with_longest_streak(habits), sep="\n- ")
+            print("Habits with active longest streak:")
+            page(habits.leaderboard.longest())
         elif choice == "9":
             habit_name = input("Enter habit name: ").strip()
             if not habit_name:
@@ -195,18 +258,26 @@ def main():
                 print("Invalid input for completion. Please enter 'yes' or 'no'.")
                 continue
             completed = completed_input == "yes"  # Convert input to boolean
-            for habit in habits:
-                if habit.name.lower() == habit_name.lower():
-                    check_in(habits, habit.name, completed)
-                    break
+            habit = habits.find(habit_name)
+            if habit is not None:
+                check_in(habits, habit.name, completed)
+                # A completed habit has already left the indexes when check_in removed it.
+                habits.refresh(habit)
             else:
-                print(f"Habit '{habit_name}' not found.")
+                print_not_found(habits, habit_name, f"Habit '{habit_name}' not found.")
         elif choice == "10":
             print(progress_summary(habits))
+            # The rollups are read from their file, so the check-ins still queued for it are handled first.
+            drain()
+            best_weekday = Rollups.open(habits).best_weekday()
+            if best_weekday:
+                print(f"Best weekday overall: {best_weekday}")
         elif choice == "11":
             delete_habit(habits)
         elif choice == "12":
-            view_completed_habits(load_completed_habits())
+            # The archive is read from its file, so the completions still queued for it are written first.
+            drain()
+            view_completed_habits(CompletedArchive())
         elif choice == "13":
             print("Exited goodbye...")
             break
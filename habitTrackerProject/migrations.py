@@ -0,0 +1,127 @@
+"""
+This module migrates the habits file to the current schema version.
+
+Schema versions:
+    1. A bare JSON list of habits, as written by the first versions of the application. Entries could be
+       partly malformed: tracked_data stored as a single dictionary, entries without a date,
+       goals stored as strings.
+    2. A JSON object {"schema_version": 2, "habits": [...]} written in compact form, where every habit
+       is in the canonical form produced by Habit.to_dict().
+    3. Like version 2, with the "compacted" aggregates of the retention policy in every habit.
+
+Old files are normalised once and rewritten in the current version, so loading a current file
+can skip every check.
+"""
+
+import json
+import os
+
+from habit import Habit
+
+SCHEMA_VERSION = 3
+
+
+def document_version(document):
+    """
+    Returns the schema version of a loaded habits file.
+
+    Args:
+        document (list or dict): The parsed JSON content of the habits file.
+
+    Returns:
+        int: The schema version of the document.
+    """
+    if isinstance(document, list):
+        return 1
+    return document.get("schema_version", 1)
+
+
+def normalise_habit(data):
+    """
+    Repairs a single habit dictionary from an old file into the canonical form.
+
+    Args:
+        data (dict): A habit dictionary in any of the old forms.
+
+    Returns:
+        dict: The habit in the canonical form.
+    """
+    tracked_data = data.get("tracked_data", [])
+    if isinstance(tracked_data, dict):
+        tracked_data = [tracked_data]
+    elif not isinstance(tracked_data, list):
+        tracked_data = []
+
+    # Entries without a date cannot be used by any analytics, so they are dropped here once.
+    entries = []
+    for entry in tracked_data:
+        if isinstance(entry, dict) and "date" in entry:
+            entries.append(dict(entry, date=str(entry["date"])))
+        else:
+            print(f"Dropping invalid tracked_data entry of '{data.get('name')}': {entry}")
+
+    habit = Habit.from_dict(dict(data, tracked_data=entries))
+    habit.goal = int(habit.goal)
+    habit.progress = int(habit.progress)
+    habit.creation_date = str(habit.creation_date)
+    return habit.to_dict()
+
+
+def _migrate_1_to_2(document):
+    habits = document if isinstance(document, list) else document.get("habits", [])
+    return {"schema_version": 2, "habits": [normalise_habit(habit) for habit in habits]}
+
+
+def _migrate_2_to_3(document):
+    habits = [dict(habit, compacted=habit.get("compacted") or {}) for habit in document["habits"]]
+    return {"schema_version": 3, "habits": habits}
+
+
+# Every migration turns a document of the version it is registered under into the next version.
+MIGRATIONS = {
+    1: _migrate_1_to_2,
+    2: _migrate_2_to_3,
+}
+
+
+def migrate(document):
+    """
+    Migrates a loaded habits file step by step to the current schema version.
+
+    Args:
+        document (list or dict): The parsed JSON content of the habits file.
+
+    Returns:
+        dict: The document in the current schema version.
+    """
+    version = document_version(document)
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"The habits file has schema version {version}, "
+                         f"this version of the application only knows up to {SCHEMA_VERSION}")
+    while version < SCHEMA_VERSION:
+        document = MIGRATIONS[version](document)
+        version = document_version(document)
+    return document
+
+
+def migrate_file(file_path):
+    """
+    Migrates a habits file in place, keeping a backup of the old file.
+
+    Args:
+        file_path (str): The path of the habits file.
+
+    Returns:
+        bool: True if the file was migrated, False if it already had the current schema version.
+    """
+    with open(file_path, "r") as file:
+        document = json.load(file)
+    version = document_version(document)
+    if version == SCHEMA_VERSION:
+        return False
+
+    document = migrate(document)
+    os.replace(file_path, f"{file_path}.v{version}.bak")
+    with open(file_path, "w") as file:
+        json.dump(document, file, separators=(",", ":"))
+    return True
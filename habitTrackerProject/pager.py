@@ -0,0 +1,62 @@
+"""
+This module streams long listings to the terminal one page at a time.
+
+The listings are consumed lazily from generators, so the first page is printed
+as soon as its lines are produced, instead of after the whole listing has been built.
+"""
+
+from itertools import islice
+
+PAGE_SIZE = 20
+
+
+def paginate(items, offset=0, limit=None):
+    """
+    Lazily selects a window of items from any iterable.
+
+    Args:
+        items (iterable): The items to select from, typically a generator.
+        offset (int): The number of items to skip.
+        limit (int): The maximum number of items to yield, or None for all the remaining items.
+
+    Returns:
+        iterator: An iterator over the selected items.
+    """
+    stop = None if limit is None else offset + limit
+    return islice(items, offset, stop)
+
+
+def page(items, page_size=PAGE_SIZE, offset=0, limit=None, numbered=False, output=print, prompt=input):
+    """
+    Streams items to the output page by page.
+
+    After every full page the user is asked whether to continue. Passing prompt=None
+    streams everything without pausing, which is what non-interactive callers should do.
+
+    Args:
+        items (iterable): The lines to output, typically a generator.
+        page_size (int): The number of lines per page.
+        offset (int): The number of lines to skip before output starts.
+        limit (int): The maximum number of lines to output, or None for no limit.
+        numbered (bool): Whether to number the lines (starting at offset + 1) instead of using bullets.
+        output (callable): The function used to write a line.
+        prompt (callable): The function used to ask for the next page, or None to never pause.
+
+    Returns:
+        int: The number of lines that were output.
+    """
+    shown = 0
+    for item in paginate(items, offset, limit):
+        # Ask before starting a new page, so nothing is asked after the last line.
+        if prompt is not None and shown and shown % page_size == 0:
+            answer = prompt("-- More (press Enter to continue, 'q' to stop) -- ").strip().lower()
+            if answer == "q":
+                break
+
+        if numbered:
+            output(f"{offset + shown + 1}. {item}")
+        else:
+            output(f"- {item}")
+        shown += 1
+
+    return shown
@@ -0,0 +1,303 @@
+"""
+This module replicates the habit data between several nodes.
+
+Every change made on a node is appended to the change log 'changes.jsonl' in the data directory,
+with a local sequence number. A replica asks for the changes since the last sequence number it has seen
+and applies them. Applying is idempotent: every change also carries the ID of the node it was first made on
+and that node's sequence number, and each node remembers the last sequence number applied per origin node.
+
+The recorded operations are:
+    - "habit_created": a habit was added, with the whole habit as data.
+    - "checked_in": a habit was checked in, with the date of the check-in and whether it was completed.
+    - "habit_completed": a habit reached its goal and was moved to the completed habits archive.
+    - "habit_deleted": a habit was deleted.
+
+A new replica can start from a snapshot of the habits, the completed habits and the cold history
+(the check-ins compacted by the retention policy) instead of the whole log.
+"""
+
+import json
+import os
+import uuid
+
+from archive import CompletedArchive, cold_history_file, iter_cold_history
+from habit import Habit, parse_entry_date
+from rollups import Rollups
+from settings import DATA_DIR
+from utility import load_habits, save_habits
+
+OPERATIONS = ("habit_created", "checked_in", "habit_completed", "habit_deleted")
+
+
+class ChangeLog:
+    """
+    The append-only change log of one node.
+
+    Args:
+        data_dir (str): The data directory of the node.
+    """
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self.file_path = os.path.join(data_dir, "changes.jsonl")
+        self.state_path = os.path.join(data_dir, "replication.json")
+        self.node_id = self._load_node_id()
+
+    def last_seq(self):
+        """Returns the sequence number of the latest change, or 0 if the log is empty."""
+        last_line = _read_last_line(self.file_path)
+        return json.loads(last_line)["seq"] if last_line else 0
+
+    def record(self, op, habit_name, data=None):
+        """
+        Appends a change made on this node to the log.
+
+        Args:
+            op (str): One of OPERATIONS.
+            habit_name (str): The name of the changed habit.
+            data (dict): The details of the change.
+
+        Returns:
+            dict: The recorded change.
+        """
+        if op not in OPERATIONS:
+            raise ValueError(f"Invalid operation: {op}")
+        seq = self.last_seq() + 1
+        change = {"op": op, "habit": habit_name, "data": data or {}, "origin": self.node_id, "origin_seq": seq}
+        return self._append(change, seq)
+
+    def iter_changes(self, since_seq=0):
+        """
+        Yields the changes with a sequence number above since_seq, oldest first.
+
+        Args:
+            since_seq (int): The last sequence number the reader has already seen.
+
+        Yields:
+            dict: Each change.
+        """
+        if not os.path.exists(self.file_path):
+            return
+        with open(self.file_path, "r") as file:
+            for line in file:
+                change = json.loads(line)
+                if change["seq"] > since_seq:
+                    yield change
+
+    def export_delta(self, since_seq=0):
+        """
+        Exports the changes since a sequence number.
+
+        Args:
+            since_seq (int): The last sequence number the replica has already seen.
+
+        Returns:
+            dict: The ID of this node, the last exported sequence number and the changes.
+        """
+        changes = list(self.iter_changes(since_seq))
+        last_seq = changes[-1]["seq"] if changes else since_seq
+        return {"node": self.node_id, "last_seq": last_seq, "changes": changes}
+
+    def export_snapshot(self):
+        """
+        Exports the full current state, to start a new replica from.
+
+        Returns:
+            dict: The ID of this node, the sequence number the snapshot is at, the last sequence number
+                applied per origin node, the active habits, the completed habits and the cold history.
+        """
+        last_seq = self.last_seq()
+        # The snapshot contains every change this node made or applied, so a replica started from it
+        # must not apply them again when it later syncs with their origin.
+        applied = dict(self._load_state()["applied"], **{self.node_id: last_seq})
+        return {
+            "node": self.node_id,
+            "last_seq": last_seq,
+            "applied": applied,
+            "habits": [habit.to_dict() for habit in load_habits(self.data_dir, read_only=True)],
+            "completed": [habit.to_dict() for habit in CompletedArchive(self.data_dir, read_only=True)],
+            "cold_history": list(iter_cold_history(self.data_dir)),
+        }
+
+    def import_snapshot(self, snapshot):
+        """
+        Replaces the habits of this node with a snapshot from another node.
+
+        The cold history is replaced too, and the rollups are rebuilt from the new habits and their cold history.
+
+        Args:
+            snapshot (dict): A snapshot from export_snapshot().
+        """
+        habits = [Habit.from_dict(habit) for habit in snapshot["habits"]]
+        save_habits(habits, self.data_dir)
+        CompletedArchive(self.data_dir).rewrite([Habit.from_dict(habit) for habit in snapshot["completed"]])
+
+        cold_history = snapshot.get("cold_history", [])
+        if cold_history:
+            temp_path = cold_history_file(self.data_dir) + ".tmp"
+            with open(temp_path, "w") as file:
+                file.writelines(json.dumps(entry) + "\n" for entry in cold_history)
+            os.replace(temp_path, cold_history_file(self.data_dir))
+        elif os.path.exists(cold_history_file(self.data_dir)):
+            os.remove(cold_history_file(self.data_dir))
+
+        names = {habit.name for habit in habits}
+        rollups = Rollups(self.data_dir)
+        rollups.rebuild(habits, (entry for entry in cold_history if entry["habit"] in names))
+        rollups.save()
+
+        state = self._load_state()
+        state["peers"][snapshot["node"]] = snapshot["last_seq"]
+        for origin, origin_seq in snapshot.get("applied", {}).items():
+            if origin != self.node_id:
+                state["applied"][origin] = max(state["applied"].get(origin, 0), origin_seq)
+        self._save_state(state)
+
+    def import_delta(self, delta, habits=None):
+        """
+        Applies the changes exported by another node. Changes that were already applied are skipped.
+
+        Applied changes are appended to this node's log too, keeping their origin,
+        so they are passed on to the replicas of this node.
+
+        Args:
+            delta (dict): A delta from export_delta().
+            habits (list): The active habits of this node, loaded from the data directory if not given.
+
+        Returns:
+            int: The number of changes that were applied.
+        """
+        if habits is None:
+            habits = load_habits(self.data_dir)
+        state = self._load_state()
+        rollups = Rollups.open(habits, self.data_dir)
+        applied = 0
+
+        for change in delta["changes"]:
+            origin = change["origin"]
+            if origin == self.node_id or change["origin_seq"] <= state["applied"].get(origin, 0):
+                continue
+            self._apply(change, habits, rollups)
+            self._append(change, self.last_seq() + 1)
+            state["applied"][origin] = change["origin_seq"]
+            applied += 1
+
+        state["peers"][delta["node"]] = max(state["peers"].get(delta["node"], 0), delta["last_seq"])
+        if applied:
+            save_habits(habits, self.data_dir)
+            rollups.save()
+        self._save_state(state)
+        return applied
+
+    def last_seen(self, node_id):
+        """Returns the last sequence number imported from a node, or 0 if nothing was imported yet."""
+        return self._load_state()["peers"].get(node_id, 0)
+
+    def _apply(self, change, habits, rollups):
+        habit = next((habit for habit in habits if habit.name == change["habit"]), None)
+        data = change["data"]
+
+        if change["op"] == "habit_created":
+            if habit is None:
+                habits.append(Habit.from_dict(data["habit"]))
+        elif change["op"] == "checked_in":
+            # Like check_in(), a second check-in within the same day or ISO week is not applied,
+            # so the same habit checked in on two nodes counts once.
+            if habit is not None and not habit.checked_in_during_period(parse_entry_date(data["date"])):
+                habit.tracked_data.append({"date": data["date"]})
+                rollups.record(habit.name, parse_entry_date(data["date"]))
+                if data.get("completed"):
+                    habit.progress += 1
+        elif change["op"] == "habit_completed":
+            if habit is not None:
+                habits.remove(habit)
+                rollups.remove_habit(habit.name)
+            completed_habit = Habit.from_dict(data["habit"])
+            archive = CompletedArchive(self.data_dir)
+            if not archive.contains(completed_habit):
+                archive.append(completed_habit)
+        elif change["op"] == "habit_deleted":
+            if habit is not None:
+                habits.remove(habit)
+                rollups.remove_habit(habit.name)
+
+    def _append(self, change, seq):
+        if not os.path.exists(self.data_dir):
+            os.makedirs(self.data_dir)
+        change = dict(change, seq=seq)
+        with open(self.file_path, "a") as file:
+            file.write(json.dumps(change) + "\n")
+        return change
+
+    def _load_node_id(self):
+        node_path = os.path.join(self.data_dir, "node_id")
+        if os.path.exists(node_path):
+            with open(node_path, "r") as file:
+                return file.read().strip()
+        if not os.path.exists(self.data_dir):
+            os.makedirs(self.data_dir)
+        node_id = uuid.uuid4().hex
+        with open(node_path, "w") as file:
+            file.write(node_id)
+        return node_id
+
+    def _load_state(self):
+        if not os.path.exists(self.state_path):
+            return {"applied": {}, "peers": {}}
+        with open(self.state_path, "r") as file:
+            return json.load(file)
+
+    def _save_state(self, state):
+        with open(self.state_path, "w") as file:
+            json.dump(state, file)
+
+
+def record_change(op, habit_name, data=None, data_dir=DATA_DIR):
+    """
+    Appends a change made on this node to the change log of a data directory.
+
+    Args:
+        op (str): One of OPERATIONS.
+        habit_name (str): The name of the changed habit.
+        data (dict): The details of the change.
+        data_dir (str): The data directory of the node.
+    """
+    ChangeLog(data_dir).record(op, habit_name, data)
+
+
+def sync(source_dir, target_dir):
+    """
+    Ships the changes the target has not seen yet from the source node to the target node.
+
+    Args:
+        source_dir (str): The data directory of the source node.
+        target_dir (str): The data directory of the target node.
+
+    Returns:
+        int: The number of changes applied on the target.
+    """
+    source = ChangeLog(source_dir)
+    target = ChangeLog(target_dir)
+    return target.import_delta(source.export_delta(target.last_seen(source.node_id)))
+
+
+def _read_last_line(file_path):
+    """Reads the last line of a file by seeking backwards from its end, or returns None for an empty file."""
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path, "rb") as file:
+        file.seek(0, os.SEEK_END)
+        position = file.tell()
+        if position == 0:
+            return None
+        # Skip the newline that ends the last line, then look for the one before it.
+        block = b""
+        while position > 0:
+            step = min(4096, position)
+            position -= step
+            file.seek(position)
+            block = file.read(step) + block
+            newline = block.rstrip(b"\n").rfind(b"\n")
+            if newline != -1:
+                return block[newline + 1:].decode("utf-8").strip()
+        return block.decode("utf-8").strip()
@@ -0,0 +1,123 @@
+"""
+This module applies the retention policy to the check-in history of the habits.
+
+The tracked_data of a habit grows with every check-in, and all of it is loaded, kept in memory and rewritten
+on every save. The analytics only need the recent check-ins plus a few aggregates, so the check-ins older than
+the retention horizon are compacted into the "compacted" aggregates of the habit:
+    - check_ins: the number of compacted check-ins,
+    - counts: the number of compacted check-ins per month, e.g. {"2024-03": 12},
+    - first_date and last_date: the first and the last compacted check-in day,
+    - boundary_streak: the length of the run ending on last_date, which a run of the retained check-ins
+      continues when its first check-in is one period after last_date,
+    - best_streak: the longest run within the compacted check-ins.
+
+The streak functions of the analytics module combine the aggregates with the retained check-ins, so
+they return the same results as before the compaction. Date range queries (check_ins_between,
+progress_summary windows, ...) only see the retained check-ins, so the horizon should be longer than
+the longest range that is queried.
+
+The raw compacted entries are appended to 'cold_history.jsonl' in the data directory, one line per check-in,
+so no history is lost.
+"""
+
+import datetime
+import json
+import os
+
+from analytics import get_days
+from archive import cold_history_file
+from habit import parse_entry_date
+from settings import DATA_DIR, RETENTION_DAYS
+from utility import save_habits
+
+# The retained check-ins must at least cover the current week, which check_in() looks at.
+MIN_RETENTION_DAYS = 7
+
+
+def compact_habit(habit, cutoff):
+    """
+    Moves the check-ins before a cutoff day out of the tracked data of a habit into its aggregates.
+
+    Args:
+        habit (Habit): The habit to compact.
+        cutoff (datetime.date): The first day whose check-ins are kept.
+
+    Returns:
+        list: The tracked_data entries that were moved out, oldest first.
+    """
+    old_entries = []
+    kept_entries = []
+    for entry in habit.tracked_data:
+        (old_entries if parse_entry_date(entry["date"]) < cutoff else kept_entries).append(entry)
+    if not old_entries:
+        return []
+    old_entries.sort(key=lambda entry: parse_entry_date(entry["date"]))
+
+    compacted = habit.compacted
+    counts = dict(compacted.get("counts", {}))
+    previous = parse_entry_date(compacted["last_date"]) if compacted else None
+    streak = compacted.get("boundary_streak", 0)
+    best_streak = compacted.get("best_streak", 0)
+    allowed_gap = get_days(habit.periodicity)
+
+    # The runs are counted on from the previous compaction, exactly like get_current_streak() walks them.
+    for entry in old_entries:
+        date = parse_entry_date(entry["date"])
+        streak = streak + 1 if previous is not None and (date - previous).days == allowed_gap else 1
+        best_streak = max(best_streak, streak)
+        previous = date
+        month = date.strftime("%Y-%m")
+        counts[month] = counts.get(month, 0) + 1
+
+    habit.compacted = {
+        "check_ins": compacted.get("check_ins", 0) + len(old_entries),
+        "counts": counts,
+        "first_date": compacted.get("first_date", parse_entry_date(old_entries[0]["date"]).isoformat()),
+        "last_date": previous.isoformat(),
+        "boundary_streak": streak,
+        "best_streak": best_streak,
+    }
+    habit.tracked_data[:] = kept_entries
+    # The cached date index is keyed by the number of entries, which later check-ins could bring back.
+    habit._date_index = None
+    return old_entries
+
+
+def apply_retention(habits, data_dir=DATA_DIR, horizon_days=RETENTION_DAYS, today=None):
+    """
+    Compacts the check-ins older than the retention horizon of every habit and saves the habits.
+
+    The compacted entries are appended to the cold history file before the habits are saved,
+    so a crash in between can only leave a check-in in both places, never in neither.
+
+    Args:
+        habits (list): The active Habit objects.
+        data_dir (str): The data directory holding the habits and the cold history.
+        horizon_days (int): The number of days of raw check-ins to keep, or 0 to keep the whole history.
+        today (datetime.date): The current date, defaults to the current date.
+
+    Returns:
+        int: The number of compacted check-ins.
+    """
+    if not horizon_days:
+        return 0
+    if horizon_days < MIN_RETENTION_DAYS:
+        raise ValueError(f"The retention horizon must be at least {MIN_RETENTION_DAYS} days")
+    if today is None:
+        today = datetime.datetime.now().date()
+    cutoff = today - datetime.timedelta(days=horizon_days)
+
+    lines = []
+    for habit in habits:
+        for entry in compact_habit(habit, cutoff):
+            lines.append(json.dumps({"habit": habit.name, **entry}) + "\n")
+    if not lines:
+        return 0
+
+    if not os.path.exists(data_dir):
+        os.makedirs(data_dir)
+    with open(cold_history_file(data_dir), "a") as file:
+        file.writelines(lines)
+    save_habits(habits, data_dir)
+    return len(lines)
+
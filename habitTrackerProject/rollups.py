@@ -0,0 +1,212 @@
+"""
+This module maintains precomputed check-in counts for the dashboards.
+
+For every active habit, and for all active habits together, the number of check-ins is counted per day,
+per ISO week, per month and per weekday. The counts are updated incrementally on every check-in, and a habit
+that is completed or deleted takes its check-ins out of the global counts too, so the global counts are always
+the sum of the counts of the active habits, whether they were updated or built from the history. They are saved to 'rollups.json' in the data directory, so heatmaps, completion trends and the best weekday
+are read from the counts instead of by rescanning the tracked data of every habit.
+
+When the rollups file is missing, the counts are built from the history of the active habits: their tracked data
+together with their check-ins in the cold history file, which the retention policy moved out of the tracked data.
+A rollups file that cannot be read is moved aside to 'rollups.json.corrupt' before the counts are built again,
+so the old counts can still be inspected.
+"""
+
+import json
+import os
+
+from archive import iter_cold_history
+from habit import parse_entry_date
+from settings import DATA_DIR
+
+BUCKETS = ("day", "week", "month", "weekday")
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def bucket_keys(date):
+    """
+    Returns the rollup key of a date for every bucket.
+
+    Args:
+        date (datetime.date): The check-in date.
+
+    Returns:
+        dict: The keys, e.g. {"day": "2025-01-10", "week": "2025-W02", "month": "2025-01", "weekday": "4"}.
+    """
+    iso_year, iso_week, _ = date.isocalendar()
+    return {
+        "day": date.isoformat(),
+        "week": f"{iso_year}-W{iso_week:02d}",
+        "month": date.strftime("%Y-%m"),
+        "weekday": str(date.weekday()),
+    }
+
+
+def _empty_counts():
+    return {bucket: {} for bucket in BUCKETS}
+
+
+class Rollups:
+    """
+    Per-habit and global check-in counts per day, ISO week, month and weekday.
+
+    Args:
+        data_dir (str): The directory holding the rollups file.
+    """
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self.file_path = os.path.join(data_dir, "rollups.json")
+        self.global_counts = _empty_counts()
+        self.habit_counts = {}
+        # Whether open() built the rollups from the habits instead of loading them.
+        self.rebuilt = False
+
+    @classmethod
+    def open(cls, habits, data_dir=DATA_DIR):
+        """
+        Loads the rollups file, or builds the rollups from the history of the habits when it cannot be loaded.
+
+        A file that is not valid JSON is moved aside to 'rollups.json.corrupt' with a warning.
+
+        Args:
+            habits (list): A list of Habit objects used to build missing rollups.
+            data_dir (str): The directory holding the rollups file and the cold history.
+
+        Returns:
+            Rollups: The loaded or newly built rollups.
+        """
+        rollups = cls(data_dir)
+        if os.path.exists(rollups.file_path):
+            with open(rollups.file_path, "r") as file:
+                try:
+                    data = json.load(file)
+                except json.JSONDecodeError:
+                    data = None
+            if data is not None:
+                rollups.global_counts = data.get("global", _empty_counts())
+                rollups.habit_counts = data.get("habits", {})
+                return rollups
+
+            corrupt_path = rollups.file_path + ".corrupt"
+            os.replace(rollups.file_path, corrupt_path)
+            print(f"Warning: the rollups file could not be read and was moved to '{corrupt_path}'. "
+                  f"The rollups are rebuilt from the check-ins of the active habits.")
+
+        names = {habit.name for habit in habits}
+        rollups.rebuild(habits, (entry for entry in iter_cold_history(data_dir) if entry["habit"] in names))
+        return rollups
+
+    def save(self):
+        """
+        Writes the rollups to 'rollups.json', creating the data directory if needed.
+
+        The rollups are written to a temporary file first, which then replaces the old file,
+        so a crash during the write never leaves a half written rollups file behind.
+        """
+        if not os.path.exists(self.data_dir):
+            os.makedirs(self.data_dir)
+        temp_path = self.file_path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump({"global": self.global_counts, "habits": self.habit_counts}, file)
+        os.replace(temp_path, self.file_path)
+
+    def rebuild(self, habits, cold_history=()):
+        """
+        Recomputes all the rollups from the tracked data of the habits and their compacted check-ins.
+
+        Args:
+            habits (list): A list of Habit objects.
+            cold_history (iterable): The compacted check-ins of the habits, see archive.iter_cold_history().
+        """
+        self.global_counts = _empty_counts()
+        self.habit_counts = {}
+        self.rebuilt = True
+        for habit in habits:
+            self.habit_counts[habit.name] = _empty_counts()
+            for entry in habit.tracked_data:
+                if isinstance(entry, dict) and "date" in entry:
+                    self.record(habit.name, parse_entry_date(entry["date"]))
+        for entry in cold_history:
+            self.record(entry["habit"], parse_entry_date(entry["date"]))
+
+    def record(self, habit_name, date):
+        """
+        Adds a single check-in to the per-habit and global counts.
+
+        Args:
+            habit_name (str): The name of the habit that was checked in.
+            date (datetime.date): The date of the check-in.
+        """
+        habit_counts = self.habit_counts.setdefault(habit_name, _empty_counts())
+        for bucket, key in bucket_keys(date).items():
+            for counts in (habit_counts, self.global_counts):
+                counts[bucket][key] = counts[bucket].get(key, 0) + 1
+
+    def remove_habit(self, habit_name):
+        """
+        Drops the counts of a completed or deleted habit, and takes its check-ins out of the global counts.
+
+        Args:
+            habit_name (str): The name of the habit.
+        """
+        habit_counts = self.habit_counts.pop(habit_name, None)
+        if habit_counts is None:
+            return
+        for bucket, counts in habit_counts.items():
+            global_counts = self.global_counts[bucket]
+            for key, count in counts.items():
+                remaining = global_counts.get(key, 0) - count
+                if remaining > 0:
+                    global_counts[key] = remaining
+                else:
+                    global_counts.pop(key, None)
+
+    def counts(self, bucket, habit_name=None):
+        """
+        Returns the check-in counts of one bucket.
+
+        Args:
+            bucket (str): One of "day", "week", "month" or "weekday".
+            habit_name (str): The habit to return the counts for, or None for the global counts.
+
+        Returns:
+            dict: A dictionary mapping each bucket key to its number of check-ins.
+        """
+        if habit_name is None:
+            return self.global_counts[bucket]
+        return self.habit_counts.get(habit_name, _empty_counts())[bucket]
+
+    def heatmap(self, habit_name=None):
+        """Returns the number of check-ins per day, e.g. for a calendar heatmap."""
+        return self.counts("day", habit_name)
+
+    def completion_trend(self, habit_name=None, bucket="week"):
+        """
+        Returns the number of check-ins per week or month in chronological order.
+
+        Args:
+            habit_name (str): The habit to return the trend for, or None for all habits.
+            bucket (str): Either "week" or "month".
+
+        Returns:
+            list: A list of (bucket key, count) tuples sorted by the bucket key.
+        """
+        return sorted(self.counts(bucket, habit_name).items())
+
+    def best_weekday(self, habit_name=None):
+        """
+        Returns the weekday with the most check-ins.
+
+        Args:
+            habit_name (str): The habit to look at, or None for all habits.
+
+        Returns:
+            str: The name of the best weekday, or None if there are no check-ins.
+        """
+        weekday_counts = self.counts("weekday", habit_name)
+        if not weekday_counts:
+            return None
+        best = max(weekday_counts, key=lambda key: (weekday_counts[key], -int(key)))
+        return WEEKDAYS[int(best)]
@@ -0,0 +1,100 @@
+"""
+This module runs a background job that keeps the streak statuses current.
+
+Whether a streak is broken depends on the current date, so statuses go stale when a session or
+service keeps running past midnight. The DayRolloverScheduler wakes up at every local midnight
+(which includes the start of every ISO week) and lets the HabitList mark the streaks whose deadline
+has just passed as broken. Queries then simply read the precomputed statuses, and a "streak_broken" event
+is emitted for every broken streak when the scheduler was given an event bus.
+
+The streaks are only broken through the scheduler, so every broken streak gets its event: code that cannot wait
+for midnight (the menu after a suspend, or a tenant store without a thread) calls catch_up() instead.
+"""
+
+import datetime
+import threading
+
+
+def seconds_until_midnight(now=None):
+    """
+    Returns the number of seconds until the next local midnight.
+
+    Args:
+        now (datetime.datetime): The current local time, defaults to datetime.now().
+
+    Returns:
+        float: The number of seconds until the next day starts.
+    """
+    if now is None:
+        now = datetime.datetime.now()
+    next_midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time.min)
+    return (next_midnight - now).total_seconds()
+
+
+class DayRolloverScheduler:
+    """
+    Background thread that advances the streak statuses of a HabitList at every local midnight.
+
+    Args:
+        habits (HabitList): The habits whose statuses are kept current.
+        on_broken (callable): Optional function called with the list of habits whose streak just broke.
+        bus (EventBus): Optional event bus the "streak_broken" events are emitted on.
+    """
+
+    def __init__(self, habits, on_broken=None, bus=None):
+        self.habits = habits
+        self.on_broken = on_broken
+        self.bus = bus
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="day-rollover", daemon=True)
+
+    def start(self):
+        """Starts the background thread."""
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops the background thread and waits for it to finish."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def run_once(self, today=None):
+        """
+        Marks the streaks whose deadline has passed as broken.
+
+        Args:
+            today (datetime.date): The current date, defaults to the current date.
+
+        Returns:
+            list: The habits whose streak broke.
+        """
+        broken = self.habits.advance_day(today)
+        if self.bus is not None:
+            for habit in broken:
+                self.bus.emit("streak_broken", habit.name, self.habits)
+        if broken and self.on_broken is not None:
+            self.on_broken(broken)
+        return broken
+
+    def catch_up(self, today=None):
+        """
+        Breaks the due streaks now when the date has changed since the habits were last advanced,
+        for example after the computer was suspended over midnight.
+
+        Args:
+            today (datetime.date): The current date, defaults to the current date.
+
+        Returns:
+            list: The habits whose streak broke.
+        """
+        if today is None:
+            today = datetime.datetime.now().date()
+        if today == self.habits.built_on:
+            return []
+        return self.run_once(today)
+
+    def _run(self):
+        # A second of slack makes sure the clock has really moved on to the new day when we wake up.
+        while not self._stop.wait(seconds_until_midnight() + 1):
+            self.run_once()
@@ -0,0 +1,172 @@
+"""
+This module indexes the habit names for lookups, autocompletion and "did you mean" suggestions.
+
+The NameIndex keeps three structures over the lower-cased habit names:
+    - a dictionary for exact, case-insensitive lookups,
+    - a prefix trie for autocompletion,
+    - a trigram index for suggesting the closest names when a name was mistyped.
+"""
+
+from difflib import SequenceMatcher
+
+
+def trigrams(text):
+    """
+    Returns the set of three-letter substrings of a name, padded so short names still have trigrams.
+
+    Args:
+        text (str): The lower-cased name.
+
+    Returns:
+        set: The trigrams of the name.
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Case-insensitive index of habit names.
+
+    Habits are kept per lower-cased name, so several habits can share a name.
+    """
+
+    def __init__(self, habits=()):
+        self._by_name = {}
+        self._trie = {}
+        self._by_trigram = {}
+        for habit in habits:
+            self.add(habit)
+
+    def __contains__(self, habit_name):
+        return habit_name.lower() in self._by_name
+
+    def add(self, habit):
+        """
+        Adds a habit to the index.
+
+        Args:
+            habit (Habit): The habit to add.
+        """
+        key = habit.name.lower()
+        habits = self._by_name.setdefault(key, [])
+        habits.append(habit)
+        if len(habits) > 1:
+            return
+
+        node = self._trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node[None] = key
+        for trigram in trigrams(key):
+            self._by_trigram.setdefault(trigram, set()).add(key)
+
+    def remove(self, habit):
+        """
+        Removes a habit from the index.
+
+        Args:
+            habit (Habit): The habit to remove.
+        """
+        key = habit.name.lower()
+        habits = self._by_name.get(key, [])
+        for position, indexed in enumerate(habits):
+            if indexed is habit:
+                del habits[position]
+                break
+        if habits:
+            return
+        self._by_name.pop(key, None)
+
+        # Remove the name from the trie, pruning the branches that no longer lead to any name.
+        path = [self._trie]
+        for char in key:
+            path.append(path[-1][char])
+        del path[-1][None]
+        for position in range(len(key) - 1, -1, -1):
+            if path[position + 1]:
+                break
+            del path[position][key[position]]
+
+        for trigram in trigrams(key):
+            names = self._by_trigram.get(trigram)
+            if names is not None:
+                names.discard(key)
+                if not names:
+                    del self._by_trigram[trigram]
+
+    def find(self, habit_name):
+        """
+        Looks up a habit by name, ignoring the case.
+
+        Args:
+            habit_name (str): The name to look up.
+
+        Returns:
+            Habit: The habit with exactly this name if there is one, otherwise the first habit whose name
+                only differs in case, or None if no habit has this name.
+        """
+        habits = self._by_name.get(habit_name.lower())
+        if not habits:
+            return None
+        for habit in habits:
+            if habit.name == habit_name:
+                return habit
+        return habits[0]
+
+    def complete(self, prefix, limit=5):
+        """
+        Returns the habit names that start with a prefix, ignoring the case.
+
+        Args:
+            prefix (str): The typed beginning of a name.
+            limit (int): The maximum number of names to return.
+
+        Returns:
+            list: Up to limit habit names in alphabetical order.
+        """
+        node = self._trie
+        for char in prefix.lower():
+            node = node.get(char)
+            if node is None:
+                return []
+
+        names = []
+        stack = [node]
+        while stack and len(names) < limit:
+            node = stack.pop()
+            if None in node:
+                names.append(self._by_name[node[None]][0].name)
+            # Children are pushed in reverse order, so they are visited alphabetically.
+            stack.extend(node[char] for char in sorted((char for char in node if char is not None), reverse=True))
+        return names
+
+    def suggest(self, habit_name, limit=3, cutoff=0.5):
+        """
+        Returns the habit names most similar to a possibly mistyped name.
+
+        Candidates are the names sharing trigrams with the typed name, and they are ranked by how similar
+        they are as a whole.
+
+        Args:
+            habit_name (str): The typed name.
+            limit (int): The maximum number of suggestions.
+            cutoff (float): The minimal similarity between 0 and 1 for a name to be suggested.
+
+        Returns:
+            list: Up to limit habit names, the most similar first.
+        """
+        key = habit_name.lower()
+        shared = {}
+        for trigram in trigrams(key):
+            for name in self._by_trigram.get(trigram, ()):
+                shared[name] = shared.get(name, 0) + 1
+
+        # Only the candidates sharing the most trigrams are compared character by character.
+        candidates = sorted(shared, key=lambda name: -shared[name])[:limit * 5]
+        scored = []
+        for name in candidates:
+            ratio = SequenceMatcher(None, key, name).ratio()
+            if ratio >= cutoff:
+                scored.append((-ratio, name))
+        return [self._by_name[name][0].name for _, name in sorted(scored)[:limit]]
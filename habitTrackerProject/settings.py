@@ -0,0 +1,15 @@
+"""
+This module holds the settings shared by the other modules of the Habit Tracker.
+
+The data directory defaults to the 'data' folder next to this file, so the application finds its files
+no matter which directory it is started from. It can be changed with the HABIT_TRACKER_DATA environment variable.
+
+Check-ins older than RETENTION_DAYS days are compacted by the retention policy before the habits are first changed,
+see the retention module. It can be changed with the HABIT_TRACKER_RETENTION_DAYS environment variable,
+where 0 keeps the whole history.
+"""
+
+import os
+
+DATA_DIR = os.environ.get("HABIT_TRACKER_DATA", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+RETENTION_DAYS = int(os.environ.get("HABIT_TRACKER_RETENTION_DAYS", "365"))
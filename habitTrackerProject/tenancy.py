@@ -0,0 +1,271 @@
+"""
+This module lets one process serve the habits of many users.
+
+Every user (tenant) gets a data directory of their own below a shared data root. The user directories
+are sharded into sub-directories named after a hash prefix of the user ID, so no single directory
+ends up holding thousands of entries:
+
+    <root>/<2 hex digits>/<user ID>/habits.json
+
+The TenantStores cache keeps a bounded number of tenant stores open, closing (and flushing)
+the least recently used one that is not in use when the limit is reached.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from analytics import check_in, find_habit
+from archive import CompletedArchive
+from events import enable_event_bus
+from habit_list import HabitList
+from retention import apply_retention
+from scheduler import DayRolloverScheduler
+from utility import enable_write_behind, load_habits
+
+USER_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9_.-]*$")
+
+
+def tenant_data_dir(root, user_id):
+    """
+    Returns the data directory of a user below the data root.
+
+    Args:
+        root (str): The shared data root of all users.
+        user_id (str): The ID of the user, made of letters, digits, '.', '_' and '-'.
+
+    Returns:
+        str: The path of the user's data directory.
+    """
+    if not USER_ID_PATTERN.match(user_id):
+        raise ValueError(f"Invalid user ID: {user_id!r}")
+    shard = hashlib.sha1(user_id.encode("utf-8")).hexdigest()[:2]
+    return os.path.join(root, shard, user_id)
+
+
+class TenantStore:
+    """
+    The habits of one user, stored in the user's own data directory.
+
+    The habits are loaded on first use, together with an asynchronous event bus whose subscribers save them
+    through a write-behind writer, so closing the store is what guarantees that the pending changes reach the disk.
+    The operations of the store are serialised by its lock, so several threads may serve the same user.
+    Once closed, the store rejects every further use; open the user again through TenantStores instead.
+
+    Args:
+        root (str): The shared data root of all users.
+        user_id (str): The ID of the user.
+        durability (str): The durability level of the habits file, see utility.DURABILITY_LEVELS.
+    """
+
+    def __init__(self, root, user_id, durability="deferred"):
+        self.user_id = user_id
+        self.data_dir = tenant_data_dir(root, user_id)
+        self._writer = enable_write_behind(durability=durability, data_dir=self.data_dir)
+        self._habits = None
+        self._bus = None
+        self._scheduler = None
+        self._closed = False
+        # The number of callers currently using the store, see TenantStores.use().
+        self._pins = 0
+        self._lock = threading.RLock()
+
+    @property
+    def closed(self):
+        """Whether the store was closed."""
+        return self._closed
+
+    @property
+    def habits(self):
+        """The active Habit objects of the user, with their indexes."""
+        with self._lock:
+            self._check_open()
+            if self._habits is None:
+                habits = load_habits(self.data_dir)
+                apply_retention(habits, self.data_dir)
+                self._habits = HabitList(habits)
+                self._bus = enable_event_bus(self._habits, self.data_dir)
+                # Rather than running a scheduler thread per user, the deadlines are caught up on access.
+                self._scheduler = DayRolloverScheduler(self._habits, bus=self._bus)
+            else:
+                self._scheduler.catch_up()
+            return self._habits
+
+    @property
+    def completed(self):
+        """The completed habits archive of the user."""
+        return CompletedArchive(self.data_dir)
+
+    def add_habit(self, habit):
+        """
+        Adds a new habit for the user.
+
+        Args:
+            habit (Habit): The habit to add.
+        """
+        with self._lock:
+            habits = self.habits
+            habits.append(habit)
+            self._bus.emit("habit_created", habit.name, habits, {"habit": habit.to_dict()})
+
+    def check_in(self, habit_name, completed=True, now=None):
+        """
+        Checks in one of the user's habits.
+
+        Args:
+            habit_name (str): The name of the habit to check in.
+            completed (bool): Whether the habit has been completed.
+            now (datetime.datetime): The time of the check-in, defaults to the current time.
+        """
+        with self._lock:
+            habits = self.habits
+            habit = habits.find(habit_name)
+            if habit is None:
+                print("Habit not found.")
+                return
+            check_in(habits, habit.name, completed, self.data_dir, now)
+            habits.refresh(habit)
+
+    def delete_habit(self, habit_name):
+        """
+        Deletes one of the user's habits.
+
+        Args:
+            habit_name (str): The name of the habit to delete.
+
+        Returns:
+            bool: True if the habit was found and deleted, otherwise False.
+        """
+        with self._lock:
+            habits = self.habits
+            habit = find_habit(habits, habit_name)
+            if habit is None:
+                return False
+            habits.remove(habit)
+            self._bus.emit("habit_deleted", habit.name, habits)
+            return True
+
+    def flush(self):
+        """Writes the pending changes of the user's habits."""
+        with self._lock:
+            if self._bus is not None:
+                self._bus.drain()
+            self._writer.flush()
+
+    def close(self):
+        """Writes the pending changes and releases the user's habits from memory."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._bus is not None:
+                self._bus.close()
+                self._bus = None
+            self._writer.close()
+            self._habits = None
+
+    def _check_open(self):
+        if self._closed:
+            raise RuntimeError(f"The store of user {self.user_id!r} is closed")
+
+
+class TenantStores:
+    """
+    A least recently used cache of open tenant stores.
+
+    Threads serving users should open them with use(), which pins the store for the duration of the call.
+    Only stores that nobody uses are evicted, so while every open store is in use the cache may briefly
+    hold more than max_open stores, at most one per concurrent caller.
+
+    Args:
+        root (str): The shared data root of all users.
+        max_open (int): The maximum number of tenant stores kept open at the same time.
+        durability (str): The durability level used for every tenant store.
+    """
+
+    def __init__(self, root, max_open=128, durability="deferred"):
+        if max_open < 1:
+            raise ValueError("max_open must be at least 1")
+        self.root = root
+        self.max_open = max_open
+        self.durability = durability
+        self._stores = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._stores)
+
+    def __contains__(self, user_id):
+        return user_id in self._stores
+
+    def get(self, user_id):
+        """
+        Returns the store of a user, opening it and evicting the least recently used store if needed.
+
+        The store is not pinned, so it can be evicted (and then rejects any use) as soon as other users are opened.
+        This is meant for single-threaded callers; threads should use use() instead.
+
+        Args:
+            user_id (str): The ID of the user.
+
+        Returns:
+            TenantStore: The store of the user.
+        """
+        with self._lock:
+            return self._open(user_id)
+
+    @contextmanager
+    def use(self, user_id):
+        """
+        Pins the store of a user for the duration of a with block, so it cannot be evicted meanwhile.
+
+        Args:
+            user_id (str): The ID of the user.
+
+        Yields:
+            TenantStore: The store of the user.
+        """
+        with self._lock:
+            store = self._open(user_id)
+            store._pins += 1
+        try:
+            yield store
+        finally:
+            with self._lock:
+                store._pins -= 1
+                self._evict()
+
+    def flush(self):
+        """Writes the pending changes of every open tenant store."""
+        with self._lock:
+            for store in self._stores.values():
+                store.flush()
+
+    def close(self):
+        """Closes every open tenant store."""
+        with self._lock:
+            while self._stores:
+                _, store = self._stores.popitem(last=False)
+                store.close()
+
+    def _open(self, user_id):
+        store = self._stores.get(user_id)
+        if store is not None:
+            self._stores.move_to_end(user_id)
+            return store
+        store = TenantStore(self.root, user_id, self.durability)
+        self._stores[user_id] = store
+        self._evict(keep=store)
+        return store
+
+    def _evict(self, keep=None):
+        """Closes the least recently used stores nobody uses until at most max_open stores are open."""
+        for user_id, store in list(self._stores.items()):
+            if len(self._stores) <= self.max_open:
+                return
+            if store is not keep and store._pins == 0:
+                del self._stores[user_id]
+                store.close()
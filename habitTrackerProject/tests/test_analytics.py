@@ -6,10 +6,10 @@ habit data formatting, and filtering of habits based on their streaks.
 """
 
 import unittest
-from analytics import get_longest_run_streak, get_habits_with_broken_streak, get_habits_with_longest_streak
+from analytics import (find_habit, get_longest_run_streak, get_habits_with_broken_streak,
+                       get_habits_with_longest_streak)
 from habit import Habit
-from datetime import datetime
-import json
+from utility import load_habits
 
 
 class TestAnalytics(unittest.TestCase):
@@ -21,14 +21,12 @@ class TestAnalytics(unittest.TestCase):
         """
         for testing the get_longest_run_streak function.
 
-        Loads the habit from 'data/habits.json', and then converts each entry to a Habit object,
+        Loads the habits from 'data/habits.json' without changing the file,
         and then asserts that the evaluated longest run streak is equal to the expected value.
         """
-        with open('data/habits.json', 'r') as file:
-            habits_data = json.load(file)
-            habits = [Habit.from_dict(habit) for habit in habits_data]
-            # The code assert that the longest streak computed matches the expected value
-            self.assertEqual(get_longest_run_streak(habits), 10)
+        habits = load_habits('data', read_only=True)
+        # The code assert that the longest streak computed matches the expected value
+        self.assertEqual(get_longest_run_streak(habits), 10)
 
     def test_habit_tracked_data_date(self):
         """
@@ -49,20 +47,24 @@ class TestAnalytics(unittest.TestCase):
         """
         For testing the get_habits_with_broken_streak function.
 
-        Loads habit data from 'data/habits.json', converts each entry to a Habit object,
+        Loads the habits from 'data/habits.json' without changing the file,
         and asserts that the function returns the expected list of habits with broken streaks.
         """
-        with open('data/habits.json', 'r') as file:
-            habits_data = json.load(file)
-            habits = [Habit.from_dict(habit) for habit in habits_data]
-            self.assertEqual(get_habits_with_broken_streak(habits),
-                             ['Weekly Planning'])
+        habits = load_habits('data', read_only=True)
+        self.assertEqual(get_habits_with_broken_streak(habits), ['Weekly Planning'])
 
     def test_get_habits_with_longest_streak(self):
-        with open('data/habits.json', 'r') as file:
-            habits_data = json.load(file)
-            habits = [Habit.from_dict(habit) for habit in habits_data]
-            self.assertEqual(get_habits_with_longest_streak(habits), ['Daily Exercise'])
+        habits = load_habits('data', read_only=True)
+        self.assertEqual(get_habits_with_longest_streak(habits), ['Daily Exercise'])
+
+    def test_find_habit_prefers_the_exact_name(self):
+        """
+        Test that find_habit on a plain list prefers the exact name over an earlier match in another case.
+        """
+        lower, upper = Habit("run", "daily", 10), Habit("Run", "daily", 10)
+        self.assertIs(find_habit([lower, upper], "Run"), upper)
+        self.assertIs(find_habit([lower, upper], "RUN"), lower)
+        self.assertIsNone(find_habit([lower, upper], "Walk"))
 
 
 if __name__ == "__main__":
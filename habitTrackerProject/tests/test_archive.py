@@ -0,0 +1,78 @@
+"""
+This a Unit tests for the completed habits archive of the Habit Tracker project.
+
+This module tests appending completed habits, listing and paging their names,
+loading them back, and the one-time import of the old completed_habits.json file.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from archive import CompletedArchive
+from habit import Habit
+
+
+class TestCompletedArchive(unittest.TestCase):
+    """
+    Test suite for the append-only completed habits archive.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_empty_archive(self):
+        """
+        Test that a new archive has no habits and lists no names.
+        """
+        archive = CompletedArchive(self.data_dir)
+        self.assertEqual(len(archive), 0)
+        self.assertEqual(archive.names(), [])
+        self.assertEqual(archive.load(), [])
+
+    def test_append_and_page_names(self):
+        """
+        Test that appended habits are counted, and that names can be paged with offset and limit.
+        """
+        archive = CompletedArchive(self.data_dir)
+        for i in range(5):
+            archive.append(Habit(f"Habit {i}", "daily", 1, 1, "Test description"))
+
+        self.assertEqual(len(archive), 5)
+        self.assertEqual(archive.names(offset=1, limit=2), ["Habit 1", "Habit 2"])
+        self.assertEqual(archive.names(offset=4, limit=10), ["Habit 4"])
+
+    def test_get_loads_full_habit(self):
+        """
+        Test that an archived habit is loaded back with its tracked data.
+        """
+        archive = CompletedArchive(self.data_dir)
+        habit = Habit("Test Habit", "daily", 1, 1, "Test description")
+        habit.add_tracked_data("2022-01-01 12:00:00")
+        archive.append(habit)
+
+        loaded = archive.get(0)
+        self.assertEqual(loaded.name, "Test Habit")
+        self.assertEqual(loaded.tracked_data[0]["date"], "2022-01-01")
+
+    def test_legacy_file_is_imported(self):
+        """
+        Test that the old completed_habits.json file is imported the first time the archive is opened.
+        """
+        legacy = [Habit("Old Habit", "weekly", 2, 2, "Test description").to_dict()]
+        with open(os.path.join(self.data_dir, "completed_habits.json"), "w") as file:
+            json.dump(legacy, file)
+
+        archive = CompletedArchive(self.data_dir)
+        self.assertEqual(archive.names(), ["Old Habit"])
+        # Opening the archive again must not import the old file a second time.
+        self.assertEqual(len(CompletedArchive(self.data_dir)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
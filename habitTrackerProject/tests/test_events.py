@@ -0,0 +1,156 @@
+"""
+This a Unit tests for the events module of the Habit Tracker project.
+
+This module tests the delivery of the events to the subscribers, the backpressure of the bounded queues
+and the check-ins handled by the default subscribers of an asynchronous and of the synchronous bus.
+"""
+
+import datetime
+import io
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+
+from analytics import check_in
+from archive import CompletedArchive
+from events import EventBus, enable_event_bus, event_bus
+from habit import Habit
+from habit_list import HabitList
+from replication import ChangeLog
+from rollups import Rollups
+from scheduler import DayRolloverScheduler
+from utility import load_habits, save_habits
+
+
+class TestEventBus(unittest.TestCase):
+    """
+    Test suite for the event bus and its subscribers.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_full_queue_blocks_the_emitter(self):
+        """
+        Test that emit() waits when a subscriber's queue is full, and that drain() waits for the handlers.
+        """
+        release = threading.Event()
+        handled = []
+
+        def slow(event):
+            release.wait()
+            handled.append(event.habit_name)
+
+        bus = EventBus(queue_size=1)
+        bus.subscribe(slow, ("checked_in",))
+        bus.emit("checked_in", "Read")
+        bus.emit("checked_in", "Walk")
+
+        emitter = threading.Thread(target=bus.emit, args=("checked_in", "Swim"))
+        emitter.start()
+        emitter.join(0.1)
+        self.assertTrue(emitter.is_alive())
+
+        release.set()
+        emitter.join()
+        bus.drain()
+        self.assertEqual(handled, ["Read", "Walk", "Swim"])
+        bus.close()
+
+    def test_failing_subscriber_does_not_stop_the_others(self):
+        """
+        Test that an error in one handler is reported and the other handlers still get the event.
+        """
+        handled = []
+
+        def failing(event):
+            raise RuntimeError("broken subscriber")
+
+        bus = EventBus(asynchronous=False)
+        bus.subscribe(failing)
+        bus.subscribe(lambda event: handled.append(event.name))
+        with redirect_stdout(io.StringIO()) as output:
+            bus.emit("habit_deleted", "Read")
+
+        self.assertEqual(handled, ["habit_deleted"])
+        self.assertIn("broken subscriber", output.getvalue())
+        with self.assertRaises(ValueError):
+            bus.emit("unknown", "Read")
+
+    def test_check_in_is_handled_by_the_default_subscribers(self):
+        """
+        Test that a check-in on an asynchronous bus reaches the habits file, the rollups, the change log
+        and the archive once the bus is drained.
+        """
+        save_habits([Habit("Read", "daily", 1, 0, "Test description")], self.data_dir)
+        habits = load_habits(self.data_dir)
+        bus = enable_event_bus(habits, self.data_dir)
+        with redirect_stdout(io.StringIO()):
+            check_in(habits, "Read", True, self.data_dir)
+        bus.close()
+
+        self.assertEqual(load_habits(self.data_dir), [])
+        self.assertEqual(CompletedArchive(self.data_dir).names(), ["Read"])
+        # The completed habit left the rollups together with its check-in.
+        self.assertEqual(Rollups.open([], self.data_dir).heatmap(), {})
+        operations = [change["op"] for change in ChangeLog(self.data_dir).iter_changes()]
+        self.assertEqual(operations, ["checked_in", "habit_completed"])
+
+    def test_synchronous_bus_is_reused(self):
+        """
+        Test that the synchronous bus of a data directory is built once, and that its rollups count every
+        check-in once, although they are built from the habits that already hold the first one.
+        """
+        habits = [Habit("Read", "daily", 10, 0, "Test description"), Habit("Walk", "daily", 10, 0, "Test")]
+        save_habits(habits, self.data_dir)
+        with redirect_stdout(io.StringIO()):
+            check_in(habits, "Read", True, self.data_dir)
+        bus = event_bus(habits, self.data_dir)
+        self.assertIs(event_bus(habits, self.data_dir), bus)
+        with redirect_stdout(io.StringIO()):
+            check_in(habits, "Walk", True, self.data_dir)
+        bus.close()
+
+        today = datetime.datetime.now().date().isoformat()
+        self.assertEqual(Rollups.open([], self.data_dir).heatmap(), {today: 2})
+
+    def test_scheduler_emits_streak_broken(self):
+        """
+        Test that the day rollover emits a "streak_broken" event for every broken streak.
+        """
+        habits = HabitList([Habit("Read", "daily", 10, 0, "Test description", tracked_data=[
+            {"date": (datetime.datetime.now() - datetime.timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S")}
+        ])])
+        broken = []
+        bus = EventBus(asynchronous=False)
+        bus.subscribe(lambda event: broken.append(event.habit_name), ("streak_broken",))
+
+        DayRolloverScheduler(habits, bus=bus).run_once(datetime.datetime.now().date() + datetime.timedelta(days=5))
+        self.assertEqual(broken, ["Read"])
+
+    def test_catch_up_emits_streak_broken(self):
+        """
+        Test that catching up on a missed day rollover emits the "streak_broken" events too.
+        """
+        today = datetime.datetime.now().date()
+        habits = HabitList([Habit("Read", "daily", 10, 0, "Test description", tracked_data=[
+            {"date": today.strftime("%Y-%m-%d %H:%M:%S")}
+        ])])
+        broken = []
+        bus = EventBus(asynchronous=False)
+        bus.subscribe(lambda event: broken.append(event.habit_name), ("streak_broken",))
+        scheduler = DayRolloverScheduler(habits, bus=bus)
+
+        self.assertEqual(scheduler.catch_up(today), [])
+        self.assertEqual(scheduler.catch_up(today + datetime.timedelta(days=5)), habits)
+        self.assertEqual(broken, ["Read"])
+        self.assertEqual(habits.by_status("broken"), habits)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+This a Unit tests for the export module of the Habit Tracker project.
+
+This module tests the flat check-in rows and their chunked CSV export.
+"""
+
+import csv
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from archive import CompletedArchive
+from export import COLUMNS, export_check_ins, iter_check_in_rows
+from habit import Habit
+from utility import save_habits
+
+
+class TestExport(unittest.TestCase):
+    """
+    Test suite for the columnar export of the check-ins.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.temp_dir.name, "data")
+        self.output_dir = os.path.join(self.temp_dir.name, "export")
+        self.habit = Habit("Read", "daily", 10, 3, "Test description", tracked_data=[
+            {"date": "2025-01-01 08:00:00"}, {"date": "2025-01-02 08:00:00"},
+            {"date": "2025-01-04 08:00:00"}, {"date": "2025-01-05 08:00:00"},
+        ])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_one_row_per_check_in_with_streaks(self):
+        """
+        Test that every check-in becomes a row with its period key and the streak columns.
+        """
+        weekly = Habit("Swim", "weekly", 2, 2, "Test description", tracked_data=[{"date": "2025-01-06"}])
+        rows = list(iter_check_in_rows([self.habit], [weekly], today=date(2025, 1, 6)))
+
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0], ("Read", "active", "daily", date(2025, 1, 1), date(2025, 1, 1).toordinal(),
+                                   "2025-01-01", 1, 2, 2))
+        self.assertEqual([row[6] for row in rows[:4]], [1, 2, 1, 2])
+        self.assertEqual(rows[4][:3], ("Swim", "completed", "weekly"))
+        self.assertEqual(rows[4][5], "2025-W02")
+
+    def test_csv_export_is_chunked(self):
+        """
+        Test that the CSV export writes numbered files of at most chunk_rows rows, each with a header.
+        """
+        save_habits([self.habit], self.data_dir)
+        CompletedArchive(self.data_dir).append(Habit("Swim", "weekly", 1, 1, "Test", tracked_data=[
+            {"date": "2025-01-06"}]))
+
+        paths = export_check_ins(self.output_dir, self.data_dir, "csv", chunk_rows=2, today=date(2025, 1, 6))
+        self.assertEqual([os.path.basename(path) for path in paths],
+                         ["check_ins-00000.csv", "check_ins-00001.csv", "check_ins-00002.csv"])
+
+        rows = []
+        for path in paths:
+            with open(path, newline="") as file:
+                reader = csv.reader(file)
+                self.assertEqual(tuple(next(reader)), COLUMNS)
+                rows.extend(reader)
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[-1][0], "Swim")
+        self.assertEqual(rows[0][3], "2025-01-01")
+
+    def test_export_leaves_old_files_untouched(self):
+        """
+        Test that exporting an old data directory migrates its files in memory only.
+        """
+        os.makedirs(self.data_dir)
+        files = {
+            "habits.json": [{"name": "Read", "periodicity": "daily", "goal": 10,
+                             "tracked_data": [{"date": "2025-01-01 08:00:00"}]}],
+            "completed_habits.json": [{"name": "Swim", "periodicity": "weekly", "goal": 1, "progress": 1,
+                                       "tracked_data": [{"date": "2025-01-06"}]}],
+        }
+        for file_name, document in files.items():
+            with open(os.path.join(self.data_dir, file_name), "w") as file:
+                json.dump(document, file)
+
+        paths = export_check_ins(self.output_dir, self.data_dir, "csv", today=date(2025, 1, 6))
+        with open(paths[0], newline="") as file:
+            self.assertEqual([row[0] for row in csv.reader(file)], ["habit_id", "Read", "Swim"])
+        self.assertEqual(sorted(os.listdir(self.data_dir)), sorted(files))
+        for file_name, document in files.items():
+            with open(os.path.join(self.data_dir, file_name)) as file:
+                self.assertEqual(json.load(file), document)
+
+
+if __name__ == "__main__":
+    unittest.main()
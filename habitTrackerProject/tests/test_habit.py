@@ -8,7 +8,7 @@ tracking data, converting to/from dictionary representations, and then the loadi
 import unittest
 from habit import Habit
 from datetime import datetime
-import json
+from utility import load_habits
 
 
 class TestHabit(unittest.TestCase):
@@ -116,20 +116,58 @@ class TestHabitTrackedData(unittest.TestCase):
         self.assertEqual(habit.tracked_data[0]["date"], "2022-01-01")
 
 
+class TestHabitRangeQueries(unittest.TestCase):
+    """
+    Test suite for the date range queries of the Habit class.
+    """
+
+    def setUp(self):
+        self.habit = Habit("Test Habit", "daily", 10, 0, "Test description")
+        for day in ["2022-01-05", "2022-01-01", "2022-01-03", "2022-01-02"]:
+            self.habit.add_tracked_data(f"{day} 12:00:00")
+
+    def test_check_ins_between(self):
+        """
+        Test that only the check-ins inside the inclusive range are returned, in date order.
+        """
+        dates = self.habit.check_ins_between(datetime(2022, 1, 2).date(), datetime(2022, 1, 4).date())
+        self.assertEqual([str(date) for date in dates], ["2022-01-02", "2022-01-03"])
+        self.assertEqual(self.habit.count_check_ins_between(datetime(2022, 1, 1).date(),
+                                                            datetime(2022, 1, 5).date()), 4)
+
+    def test_date_index_follows_new_check_ins(self):
+        """
+        Test that check-ins added after a query are included in the next query.
+        """
+        self.habit.date_index()
+        self.habit.add_tracked_data("2022-01-04 12:00:00")
+        self.assertEqual(self.habit.count_check_ins_between(datetime(2022, 1, 4).date(),
+                                                            datetime(2022, 1, 4).date()), 1)
+
+    def test_completion_ratio_between(self):
+        """
+        Test that the completion ratio counts checked days for daily habits and checked weeks for weekly habits.
+        """
+        self.assertEqual(self.habit.completion_ratio_between(datetime(2022, 1, 1).date(),
+                                                             datetime(2022, 1, 10).date()), 0.4)
+        self.habit.periodicity = "weekly"
+        # 2022-01-01 and 2022-01-02 belong to one ISO week, 2022-01-03 and 2022-01-05 to the next.
+        self.assertEqual(self.habit.completion_ratio_between(datetime(2022, 1, 1).date(),
+                                                             datetime(2022, 1, 16).date()), 2 / 3)
+
+
 class TestHabitFromFile(unittest.TestCase):
     """
     Test suite for creating Habit objects from file data.
     """
 
     def test_habit_from_file(self):
-        with open('data/habits.json', 'r') as file:
-            habits_data = json.load(file)
-            habit = Habit.from_dict(habits_data[0])
-            self.assertEqual(habit.name, "Daily Exercise")
-            self.assertEqual(habit.periodicity, "daily")
-            self.assertEqual(habit.goal, 60)
-            self.assertEqual(habit.progress, 40)
-            self.assertEqual(habit.description, "Exercise for 30 minutes")
+        habit = load_habits('data', read_only=True)[0]
+        self.assertEqual(habit.name, "Daily Exercise")
+        self.assertEqual(habit.periodicity, "daily")
+        self.assertEqual(habit.goal, 60)
+        self.assertEqual(habit.progress, 40)
+        self.assertEqual(habit.description, "Exercise for 30 minutes")
 
 
 if __name__ == "__main__":
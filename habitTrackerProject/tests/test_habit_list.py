@@ -0,0 +1,95 @@
+"""
+This a Unit tests for the HabitList container of the Habit Tracker project.
+
+This module tests that the secondary indexes by periodicity, status and creation date
+stay consistent when habits are added, checked in and removed.
+"""
+
+import unittest
+from datetime import datetime, timedelta
+
+from habit import Habit
+from habit_list import HabitList
+
+
+class TestHabitList(unittest.TestCase):
+    """
+    Test suite for the indexed list of active habits.
+    """
+
+    def setUp(self):
+        yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S")
+        self.read = Habit("Read", "daily", 10, 0, "Test description", creation_date="2022-01-02 08:00:00")
+        self.read.add_tracked_data(yesterday)
+        self.run = Habit("Run", "daily", 10, 0, "Test description", creation_date="2022-01-01 08:00:00")
+        self.run.add_tracked_data("2022-01-01 08:00:00")
+        self.plan = Habit("Plan", "weekly", 4, 0, "Test description", creation_date="2022-01-03 08:00:00")
+        self.habits = HabitList([self.read, self.run, self.plan])
+
+    def test_indexes_built_from_habits(self):
+        """
+        Test the indexes of the initial habits.
+        """
+        self.assertEqual(self.habits.by_periodicity("daily"), [self.read, self.run])
+        self.assertEqual(self.habits.count_by_periodicity("weekly"), 1)
+        self.assertEqual(self.habits.by_status("broken"), [self.run])
+        self.assertEqual(self.habits.count_by_status("active"), 2)
+        self.assertEqual(self.habits.by_creation_date(), [self.run, self.read, self.plan])
+        self.assertEqual(self.habits.leaderboard.top(10), [("Read", 1)])
+
+    def test_append_and_remove(self):
+        """
+        Test that appended habits are indexed and removed habits leave every index.
+        """
+        new_habit = Habit("Stretch", "weekly", 4, 0, "Test description", creation_date="2021-12-31 08:00:00")
+        self.habits.append(new_habit)
+        self.assertEqual(self.habits.by_periodicity("weekly"), [self.plan, new_habit])
+        self.assertEqual(self.habits.by_creation_date()[0], new_habit)
+
+        self.habits.remove(self.read)
+        self.assertEqual(self.habits.by_periodicity("daily"), [self.run])
+        self.assertEqual(self.habits.count_by_status("active"), 2)
+        self.assertEqual(self.habits.leaderboard.max(), 0)
+        self.assertIsNone(self.habits.find("Read"))
+
+    def test_refresh_after_check_in(self):
+        """
+        Test that refresh moves a checked in habit to its new status and streak.
+        """
+        self.run.tracked_data.append({"date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
+        self.run.progress = 10
+        self.habits.refresh(self.run)
+        self.assertEqual(self.habits.by_goal_reached(), [self.run])
+        self.assertEqual(self.habits.by_status("active"), [self.read, self.plan, self.run])
+        self.assertEqual(self.habits.count_by_status("broken"), 0)
+
+    def test_habit_without_goal_can_break(self):
+        """
+        Test that a habit whose goal is 0 has a streak status and deadline like any other habit.
+        """
+        today = datetime.now().date()
+        stretch = Habit("Stretch", "daily", 0, 0, "Test description")
+        stretch.add_tracked_data(today.strftime("%Y-%m-%d %H:%M:%S"))
+        self.habits.append(stretch)
+        self.assertIn(stretch, self.habits.by_status("active"))
+        self.assertEqual(self.habits.by_goal_reached(), [])
+
+        self.assertCountEqual(self.habits.advance_day(today + timedelta(days=2)), [self.read, stretch])
+        self.assertIn(stretch, self.habits.by_status("broken"))
+
+    def test_advance_day_breaks_due_streaks(self):
+        """
+        Test that advancing the day only breaks the streaks whose deadline has passed.
+        """
+        today = datetime.now().date()
+        self.assertEqual(self.habits.next_deadline(), today + timedelta(days=1))
+        self.assertEqual(self.habits.advance_day(today), [])
+
+        self.assertEqual(self.habits.advance_day(today + timedelta(days=1)), [self.read])
+        self.assertEqual(self.habits.by_status("broken"), [self.run, self.read])
+        self.assertEqual(self.habits.leaderboard.max(), 0)
+        self.assertIsNone(self.habits.next_deadline())
+
+
+if __name__ == "__main__":
+    unittest.main()
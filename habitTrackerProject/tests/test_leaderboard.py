@@ -0,0 +1,84 @@
+"""
+This a Unit tests for the streak leaderboard of the Habit Tracker project.
+
+This module tests ranking, top-K queries, per-periodicity leaderboards and the
+removal of habits from the leaderboard.
+"""
+
+import unittest
+from datetime import datetime
+
+from analytics import get_current_streak
+from habit import Habit
+from leaderboard import StreakLeaderboard
+
+
+class TestStreakLeaderboard(unittest.TestCase):
+    """
+    Test suite for the sorted leaderboard of active streaks.
+    """
+
+    def setUp(self):
+        self.leaderboard = StreakLeaderboard()
+        self.read = Habit("Read", "daily", 10)
+        self.leaderboard.set_streak(self.read, 5)
+        self.leaderboard.set_streak(Habit("Run", "daily", 10), 9)
+        self.leaderboard.set_streak(Habit("Plan", "weekly", 10), 9)
+        self.leaderboard.set_streak(Habit("Review", "weekly", 10), 0)
+
+    def test_max_and_top(self):
+        """
+        Test that the longest streak is first and ties are ordered by name.
+        """
+        self.assertEqual(self.leaderboard.max(), 9)
+        self.assertEqual(self.leaderboard.top(2), [("Plan", 9), ("Run", 9)])
+        self.assertEqual(self.leaderboard.longest(), ["Plan", "Run"])
+        # Habits without an active streak are not ranked.
+        self.assertEqual(len(self.leaderboard), 3)
+
+    def test_per_periodicity_top(self):
+        """
+        Test that each periodicity has its own leaderboard.
+        """
+        self.assertEqual(self.leaderboard.top(10, "daily"), [("Run", 9), ("Read", 5)])
+        self.assertEqual(self.leaderboard.top(10, "weekly"), [("Plan", 9)])
+
+    def test_streak_changes_and_removal(self):
+        """
+        Test that a changed streak moves the habit, and that removed habits leave every leaderboard.
+        """
+        self.leaderboard.set_streak(self.read, 12)
+        self.assertEqual(self.leaderboard.top(1), [("Read", 12)])
+        self.leaderboard.remove(self.read)
+        self.assertEqual(self.leaderboard.max(), 9)
+        self.assertEqual(self.leaderboard.top(10, "daily"), [("Run", 9)])
+
+    def test_update_computes_current_streak(self):
+        """
+        Test that update ranks a habit by its active streak on the given day.
+        """
+        habit = Habit("Test Habit", "daily", 10, 0, "Test description")
+        for day in ["2022-01-01", "2022-01-03", "2022-01-04", "2022-01-05"]:
+            habit.add_tracked_data(f"{day} 12:00:00")
+        today = datetime(2022, 1, 6).date()
+
+        self.assertEqual(get_current_streak(habit, today), 3)
+        self.leaderboard.update(habit, today)
+        self.assertEqual(self.leaderboard.streak(habit), 3)
+
+    def test_habits_with_the_same_name(self):
+        """
+        Test that two habits with the same name are ranked separately, and removing one keeps the other.
+        """
+        other_read = Habit("Read", "weekly", 10)
+        self.leaderboard.set_streak(other_read, 7)
+        self.assertEqual(self.leaderboard.top(10, "daily"), [("Run", 9), ("Read", 5)])
+        self.assertEqual(self.leaderboard.top(10, "weekly"), [("Plan", 9), ("Read", 7)])
+
+        self.leaderboard.remove(self.read)
+        self.assertEqual(self.leaderboard.streak(other_read), 7)
+        self.assertEqual(self.leaderboard.top(10), [("Plan", 9), ("Run", 9), ("Read", 7)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+This a Unit tests for the migrations module of the Habit Tracker project.
+
+This module tests the one-time migration of old habits files to the current schema version.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from migrations import SCHEMA_VERSION, migrate
+from utility import habits_file, load_habits, save_habits
+
+
+class TestMigrations(unittest.TestCase):
+    """
+    Test suite for the schema versions of the habits file.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = self.temp_dir.name
+        self.file_path = habits_file(self.data_dir)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_migrate_repairs_old_habits(self):
+        """
+        Test that a bare list of habits is normalised into the current schema version.
+        """
+        document = migrate([{
+            "name": "Test Habit",
+            "periodicity": "daily",
+            "goal": "10",
+            "progress": 1,
+            "description": "Test description",
+            "creation_date": "2025-01-01 10:00:00",
+            "tracked_data": {"date": "2025-01-02 10:00:00"},
+        }, {
+            "name": "Other Habit",
+            "periodicity": "weekly",
+            "tracked_data": [{"date": "2025-01-03"}, {"completed": True}],
+        }])
+
+        self.assertEqual(document["schema_version"], SCHEMA_VERSION)
+        first, second = document["habits"]
+        self.assertEqual(first["goal"], 10)
+        self.assertEqual(first["tracked_data"], [{"date": "2025-01-02 10:00:00"}])
+        self.assertEqual(second["tracked_data"], [{"date": "2025-01-03"}])
+
+    def test_old_file_is_migrated_once(self):
+        """
+        Test that loading an old file rewrites it in the current schema version and keeps a backup.
+        """
+        with open(self.file_path, "w") as file:
+            json.dump([{"name": "Test Habit", "periodicity": "daily", "goal": 10,
+                        "tracked_data": [{"date": "2025-01-02"}]}], file)
+
+        habits = load_habits(self.data_dir)
+        self.assertEqual([habit.name for habit in habits], ["Test Habit"])
+        self.assertTrue(os.path.exists(self.file_path + ".v1.bak"))
+        with open(self.file_path, "r") as file:
+            self.assertEqual(json.load(file)["schema_version"], SCHEMA_VERSION)
+
+        save_habits(habits, self.data_dir)
+        self.assertEqual(load_habits(self.data_dir)[0].tracked_data, [{"date": "2025-01-02"}])
+
+    def test_read_only_load_leaves_old_file(self):
+        """
+        Test that loading an old file read-only migrates it in memory without touching the file.
+        """
+        old_document = [{"name": "Test Habit", "periodicity": "daily", "goal": 10,
+                         "tracked_data": [{"date": "2025-01-02"}]}]
+        with open(self.file_path, "w") as file:
+            json.dump(old_document, file)
+
+        habits = load_habits(self.data_dir, read_only=True)
+        self.assertEqual(habits[0].tracked_data, [{"date": "2025-01-02"}])
+        self.assertEqual(habits[0].compacted, {})
+        self.assertEqual(os.listdir(self.data_dir), ["habits.json"])
+        with open(self.file_path, "r") as file:
+            self.assertEqual(json.load(file), old_document)
+
+    def test_newer_file_is_rejected(self):
+        """
+        Test that a file from a newer version of the application is not silently loaded.
+        """
+        with self.assertRaises(ValueError):
+            migrate({"schema_version": SCHEMA_VERSION + 1, "habits": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
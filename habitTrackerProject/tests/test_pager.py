@@ -0,0 +1,50 @@
+"""
+This a Unit tests for the pager module of the Habit Tracker project.
+
+This module tests the lazy offset/limit selection and the page by page streaming of listings.
+"""
+
+import unittest
+
+from pager import page, paginate
+
+
+class TestPager(unittest.TestCase):
+    """
+    Test suite for paginating and paging listings.
+    """
+
+    def test_paginate_offset_and_limit(self):
+        """
+        Test that paginate selects the requested window from a generator.
+        """
+        items = (f"Habit {i}" for i in range(10))
+        self.assertEqual(list(paginate(items, offset=3, limit=2)), ["Habit 3", "Habit 4"])
+
+    def test_page_stops_when_user_quits(self):
+        """
+        Test that page asks between pages and stops streaming once the user enters 'q'.
+        """
+        lines = []
+        prompts = []
+
+        def answer(message):
+            prompts.append(message)
+            return "q"
+
+        shown = page((f"Habit {i}" for i in range(10)), page_size=3, output=lines.append, prompt=answer)
+        self.assertEqual(shown, 3)
+        self.assertEqual(lines, ["- Habit 0", "- Habit 1", "- Habit 2"])
+        self.assertEqual(len(prompts), 1)
+
+    def test_page_without_prompt_numbers_lines(self):
+        """
+        Test that page streams everything without pausing when no prompt is given.
+        """
+        lines = []
+        page(["Read", "Run"], page_size=1, offset=1, numbered=True, output=lines.append, prompt=None)
+        self.assertEqual(lines, ["2. Run"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+"""
+This a Unit tests for the replication module of the Habit Tracker project.
+
+This module tests syncing two local data directories through the change log,
+including idempotent imports, starting a replica from a snapshot and the rollups of a replica.
+"""
+
+import datetime
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from analytics import check_in
+from archive import CompletedArchive, iter_cold_history
+from habit import Habit
+from replication import ChangeLog, record_change, sync
+from retention import apply_retention
+from rollups import Rollups
+from utility import load_habits, save_habits
+
+
+class TestReplication(unittest.TestCase):
+    """
+    Test suite for the snapshot and delta exchange between two nodes.
+    """
+
+    def setUp(self):
+        self.node_a = tempfile.TemporaryDirectory()
+        self.node_b = tempfile.TemporaryDirectory()
+        self.dir_a = self.node_a.name
+        self.dir_b = self.node_b.name
+
+    def tearDown(self):
+        self.node_a.cleanup()
+        self.node_b.cleanup()
+
+    def add_habit(self, habit):
+        habits = load_habits(self.dir_a)
+        habits.append(habit)
+        save_habits(habits, self.dir_a)
+        record_change("habit_created", habit.name, {"habit": habit.to_dict()}, self.dir_a)
+
+    def test_delta_sync_is_idempotent(self):
+        """
+        Test that created habits and check-ins reach the replica once, even when a delta is applied twice.
+        """
+        self.add_habit(Habit("Read", "daily", 10, 0, "Test description"))
+        habits = load_habits(self.dir_a)
+        with redirect_stdout(io.StringIO()):
+            check_in(habits, "Read", True, self.dir_a)
+
+        self.assertEqual(sync(self.dir_a, self.dir_b), 2)
+        replica = load_habits(self.dir_b)
+        self.assertEqual(replica[0].name, "Read")
+        self.assertEqual(replica[0].progress, 1)
+        self.assertEqual(len(replica[0].tracked_data), 1)
+
+        # Nothing new since the last sync, and replaying the whole log applies nothing either.
+        self.assertEqual(sync(self.dir_a, self.dir_b), 0)
+        self.assertEqual(ChangeLog(self.dir_b).import_delta(ChangeLog(self.dir_a).export_delta(0)), 0)
+        self.assertEqual(load_habits(self.dir_b)[0].progress, 1)
+
+    def test_completion_and_deletion_are_replicated(self):
+        """
+        Test that completed habits move to the replica's archive and deleted habits disappear.
+        """
+        self.add_habit(Habit("Read", "daily", 1, 0, "Test description"))
+        self.add_habit(Habit("Run", "daily", 5, 0, "Test description"))
+        sync(self.dir_a, self.dir_b)
+
+        habits = load_habits(self.dir_a)
+        with redirect_stdout(io.StringIO()):
+            check_in(habits, "Read", True, self.dir_a)
+        habits.remove(habits[0])
+        save_habits(habits, self.dir_a)
+        record_change("habit_deleted", "Run", data_dir=self.dir_a)
+
+        sync(self.dir_a, self.dir_b)
+        self.assertEqual(load_habits(self.dir_b), [])
+        self.assertEqual(CompletedArchive(self.dir_b).names(), ["Read"])
+
+    def test_snapshot_then_delta(self):
+        """
+        Test that a replica started from a snapshot only receives the later changes.
+        """
+        self.add_habit(Habit("Read", "daily", 10, 0, "Test description"))
+        ChangeLog(self.dir_b).import_snapshot(ChangeLog(self.dir_a).export_snapshot())
+        self.assertEqual([habit.name for habit in load_habits(self.dir_b)], ["Read"])
+
+        self.add_habit(Habit("Run", "weekly", 4, 0, "Test description"))
+        self.assertEqual(sync(self.dir_a, self.dir_b), 1)
+        self.assertEqual([habit.name for habit in load_habits(self.dir_b)], ["Read", "Run"])
+
+    def test_snapshot_replaces_the_rollups_and_cold_history(self):
+        """
+        Test that importing a snapshot rebuilds the rollups from the imported habits, compacted check-ins included.
+        """
+        old = Habit("Old", "daily", 10, 0, "Test description", tracked_data=[{"date": "2025-01-01 08:00:00"}])
+        save_habits([old], self.dir_b)
+        Rollups.open([old], self.dir_b).save()
+
+        read = Habit("Read", "daily", 10, 0, "Test description", tracked_data=[
+            {"date": "2025-01-01 08:00:00"}, {"date": "2025-06-01 08:00:00"}])
+        save_habits([read], self.dir_a)
+        apply_retention(load_habits(self.dir_a), self.dir_a, horizon_days=30, today=datetime.date(2025, 6, 10))
+        ChangeLog(self.dir_b).import_snapshot(ChangeLog(self.dir_a).export_snapshot())
+
+        self.assertEqual(len(list(iter_cold_history(self.dir_b, "Read"))), 1)
+        rollups = Rollups.open([], self.dir_b)
+        self.assertEqual(rollups.heatmap("Old"), {})
+        self.assertEqual(rollups.heatmap("Read"), {"2025-01-01": 1, "2025-06-01": 1})
+
+    def test_replica_from_a_relayed_snapshot_skips_contained_changes(self):
+        """
+        Test that a replica started from another replica's snapshot does not apply the contained changes again
+        when it syncs with their origin.
+        """
+        with tempfile.TemporaryDirectory() as dir_c:
+            self.add_habit(Habit("Read", "daily", 1, 0, "Test description"))
+            habits = load_habits(self.dir_a)
+            with redirect_stdout(io.StringIO()):
+                check_in(habits, "Read", True, self.dir_a)
+            sync(self.dir_a, self.dir_b)
+
+            ChangeLog(dir_c).import_snapshot(ChangeLog(self.dir_b).export_snapshot())
+            self.assertEqual(sync(self.dir_a, dir_c), 0)
+            self.assertEqual(CompletedArchive(dir_c).names(), ["Read"])
+
+            # Even when a completion arrives twice, the habit is archived once.
+            completion = next(change for change in ChangeLog(self.dir_a).iter_changes()
+                              if change["op"] == "habit_completed")
+            relayed = dict(completion, origin="other", origin_seq=1)
+            self.assertEqual(ChangeLog(dir_c).import_delta({"node": "other", "last_seq": 1, "changes": [relayed]}), 1)
+            self.assertEqual(CompletedArchive(dir_c).names(), ["Read"])
+
+    def test_same_day_check_ins_on_two_nodes_count_once(self):
+        """
+        Test that a habit checked in on the same day on two nodes keeps a single check-in after the merge.
+        """
+        self.add_habit(Habit("Read", "daily", 10, 0, "Test description"))
+        sync(self.dir_a, self.dir_b)
+        today = datetime.datetime.now().strftime("%Y-%m-%d")
+
+        habits = load_habits(self.dir_b)
+        with redirect_stdout(io.StringIO()):
+            check_in(habits, "Read", True, self.dir_b)
+        record_change("checked_in", "Read", {"date": f"{today} 23:59:59", "completed": True}, self.dir_a)
+
+        self.assertEqual(sync(self.dir_a, self.dir_b), 1)
+        replica = load_habits(self.dir_b)[0]
+        self.assertEqual(len(replica.tracked_data), 1)
+        self.assertEqual(replica.progress, 1)
+
+    def test_rollups_of_synced_check_ins_survive_local_check_ins(self):
+        """
+        Test that a local check-in after a sync keeps the rollup counts the sync wrote for the replica.
+        """
+        self.add_habit(Habit("Read", "daily", 10, 0, "Test description"))
+        self.add_habit(Habit("Run", "daily", 10, 0, "Test description"))
+        self.add_habit(Habit("Swim", "daily", 10, 0, "Test description"))
+        sync(self.dir_a, self.dir_b)
+        today = datetime.datetime.now().date().isoformat()
+
+        habits_b = load_habits(self.dir_b)
+        with redirect_stdout(io.StringIO()):
+            check_in(habits_b, "Read", True, self.dir_b)
+            check_in(load_habits(self.dir_a), "Run", True, self.dir_a)
+        sync(self.dir_a, self.dir_b)
+        self.assertEqual(Rollups.open([], self.dir_b).heatmap("Run"), {today: 1})
+
+        with redirect_stdout(io.StringIO()):
+            check_in(load_habits(self.dir_b), "Swim", True, self.dir_b)
+        rollups = Rollups.open([], self.dir_b)
+        self.assertEqual(rollups.heatmap("Run"), {today: 1})
+        self.assertEqual(rollups.heatmap(), {today: 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
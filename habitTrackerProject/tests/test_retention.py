@@ -0,0 +1,106 @@
+"""
+This a Unit tests for the retention module of the Habit Tracker project.
+
+This module tests that compacting old check-ins keeps the streaks correct and moves the raw history
+to the cold history file.
+"""
+
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from datetime import date, datetime, timedelta
+
+from analytics import check_in, get_best_streak, get_current_streak, get_habits_with_broken_streak
+from archive import CompletedArchive, iter_cold_history
+from habit import Habit
+from habit_list import habit_status
+from retention import apply_retention
+from utility import load_habits
+
+
+def daily_check_ins(first_day, days):
+    return [{"date": f"{first_day + timedelta(days=offset)} 08:00:00"} for offset in range(days)]
+
+
+class TestRetention(unittest.TestCase):
+    """
+    Test suite for the compaction of the check-in history.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = self.temp_dir.name
+        self.today = date(2025, 6, 30)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_streak_continues_into_the_compacted_history(self):
+        """
+        Test that a run crossing the retention horizon keeps its full length.
+        """
+        habit = Habit("Read", "daily", 100, 0, "Test description",
+                      tracked_data=daily_check_ins(self.today - timedelta(days=19), 20))
+
+        self.assertEqual(apply_retention([habit], self.data_dir, horizon_days=7, today=self.today), 12)
+        self.assertEqual(len(habit.tracked_data), 8)
+        self.assertEqual(habit.compacted["check_ins"], 12)
+        self.assertEqual(get_current_streak(habit, self.today), 20)
+        self.assertEqual(get_best_streak(habit), 20)
+        self.assertEqual(len(list(iter_cold_history(self.data_dir, "Read"))), 12)
+
+    def test_best_streak_is_kept_in_the_aggregates(self):
+        """
+        Test that a longer run that is entirely compacted is still the best streak, and the recent run is current.
+        """
+        tracked_data = daily_check_ins(date(2025, 1, 1), 10) + daily_check_ins(self.today - timedelta(days=2), 3)
+        habit = Habit("Read", "daily", 100, 0, "Test description", tracked_data=tracked_data)
+        apply_retention([habit], self.data_dir, horizon_days=30, today=self.today)
+
+        self.assertEqual(habit.compacted["counts"], {"2025-01": 10})
+        self.assertEqual(get_best_streak(habit), 10)
+        self.assertEqual(get_current_streak(habit, self.today), 3)
+
+        reloaded = load_habits(self.data_dir)[0]
+        self.assertEqual(reloaded.compacted, habit.compacted)
+        self.assertEqual(get_current_streak(reloaded, self.today), 3)
+
+    def test_fully_compacted_habit_is_broken(self):
+        """
+        Test that a habit whose every check-in was compacted still counts as broken.
+        """
+        habit = Habit("Swim", "weekly", 100, 0, "Test description", tracked_data=[{"date": "2025-01-06"}])
+        apply_retention([habit], self.data_dir, horizon_days=30, today=self.today)
+
+        self.assertEqual(habit.tracked_data, [])
+        self.assertEqual(habit_status(habit, self.today), "broken")
+        self.assertEqual(get_current_streak(habit, self.today), 0)
+        self.assertEqual(get_habits_with_broken_streak([habit]), ["Swim"])
+
+    def test_completed_habit_keeps_its_aggregates(self):
+        """
+        Test that a compacted habit completed by a check-in is archived with its aggregates and full streak.
+        """
+        today = datetime.now().date()
+        habit = Habit("Read", "daily", 41, 40, "Test description",
+                      tracked_data=daily_check_ins(today - timedelta(days=40), 40))
+        apply_retention([habit], self.data_dir, horizon_days=10, today=today)
+        self.assertEqual(len(habit.tracked_data), 10)
+
+        with redirect_stdout(io.StringIO()):
+            check_in([habit], "Read", True, self.data_dir)
+        archived = list(CompletedArchive(self.data_dir))[0]
+        self.assertEqual(archived.compacted["check_ins"], 30)
+        self.assertEqual(get_best_streak(archived), 41)
+
+    def test_short_horizon_is_rejected(self):
+        """
+        Test that a horizon shorter than a week is rejected, since check_in() needs the current week.
+        """
+        with self.assertRaises(ValueError):
+            apply_retention([], self.data_dir, horizon_days=3, today=self.today)
+
+
+if __name__ == "__main__":
+    unittest.main()
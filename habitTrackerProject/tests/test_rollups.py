@@ -0,0 +1,106 @@
+"""
+This a Unit tests for the rollups module of the Habit Tracker project.
+
+This module tests building the rollups from tracked data and cold history, incremental updates, corrupt files
+and the dashboard queries.
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from datetime import date, datetime
+
+from habit import Habit
+from retention import apply_retention
+from rollups import Rollups
+
+
+class TestRollups(unittest.TestCase):
+    """
+    Test suite for the precomputed daily, weekly and monthly check-in counts.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        habit = Habit("Test Habit", "daily", 10, 0, "Test description")
+        # 2022-01-03 and 2022-01-10 are Mondays, 2022-01-04 is a Tuesday.
+        for day in ["2022-01-03", "2022-01-04", "2022-01-10"]:
+            habit.add_tracked_data(f"{day} 12:00:00")
+        self.habits = [habit]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_rollups_built_from_history(self):
+        """
+        Test that missing rollups are built from the tracked data of the habits.
+        """
+        rollups = Rollups.open(self.habits, self.temp_dir.name)
+        self.assertEqual(rollups.heatmap("Test Habit"), {"2022-01-03": 1, "2022-01-04": 1, "2022-01-10": 1})
+        self.assertEqual(rollups.completion_trend(bucket="week"), [("2022-W01", 2), ("2022-W02", 1)])
+        self.assertEqual(rollups.counts("month"), {"2022-01": 3})
+        self.assertEqual(rollups.best_weekday("Test Habit"), "Monday")
+
+    def test_record_is_saved_and_reloaded(self):
+        """
+        Test that an incremental check-in is persisted and loaded back without rebuilding.
+        """
+        rollups = Rollups.open(self.habits, self.temp_dir.name)
+        rollups.record("Test Habit", datetime(2022, 1, 4).date())
+        rollups.save()
+
+        reloaded = Rollups.open([], self.temp_dir.name)
+        self.assertEqual(reloaded.counts("day", "Test Habit")["2022-01-04"], 2)
+
+    def test_remove_habit_matches_a_rebuild(self):
+        """
+        Test that removing a habit takes its check-ins out of the global counts, like a rebuild without it.
+        """
+        other = Habit("Other Habit", "daily", 10, 0, "Test description", tracked_data=[
+            {"date": "2022-01-04 08:00:00"}])
+        rollups = Rollups.open(self.habits + [other], self.temp_dir.name)
+        rollups.remove_habit("Test Habit")
+        self.assertEqual(rollups.heatmap("Test Habit"), {})
+        self.assertEqual(rollups.heatmap(), {"2022-01-04": 1})
+
+        rebuilt = Rollups(self.temp_dir.name)
+        rebuilt.rebuild([other])
+        self.assertEqual(rollups.global_counts, rebuilt.global_counts)
+
+    def test_rebuild_counts_the_compacted_check_ins(self):
+        """
+        Test that rollups built after the retention policy ran still count the check-ins in the cold history.
+        """
+        apply_retention(self.habits, self.temp_dir.name, horizon_days=7, today=date(2022, 1, 12))
+        self.assertEqual(len(self.habits[0].tracked_data), 1)
+
+        rollups = Rollups.open(self.habits, self.temp_dir.name)
+        self.assertEqual(rollups.heatmap("Test Habit"), {"2022-01-03": 1, "2022-01-04": 1, "2022-01-10": 1})
+
+    def test_corrupt_file_is_moved_aside(self):
+        """
+        Test that a rollups file that cannot be read is kept as 'rollups.json.corrupt' and reported,
+        and that saving the rebuilt rollups leaves no temporary file behind.
+        """
+        rollups_path = os.path.join(self.temp_dir.name, "rollups.json")
+        with open(rollups_path, "w") as file:
+            file.write('{"global": {"day": ')
+
+        with redirect_stdout(io.StringIO()) as output:
+            rollups = Rollups.open(self.habits, self.temp_dir.name)
+        self.assertIn("rollups.json.corrupt", output.getvalue())
+        with open(rollups_path + ".corrupt") as file:
+            self.assertEqual(file.read(), '{"global": {"day": ')
+        self.assertEqual(sum(rollups.heatmap().values()), 3)
+
+        rollups.save()
+        with open(rollups_path) as file:
+            self.assertEqual(sum(json.load(file)["global"]["day"].values()), 3)
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)), ["rollups.json", "rollups.json.corrupt"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+This a Unit tests for the habit name index of the Habit Tracker project.
+
+This module tests case-insensitive lookups, prefix autocompletion, "did you mean" suggestions
+and keeping the index consistent when habits are removed.
+"""
+
+import unittest
+
+from habit import Habit
+from search import NameIndex
+
+
+class TestNameIndex(unittest.TestCase):
+    """
+    Test suite for the trie and trigram index over habit names.
+    """
+
+    def setUp(self):
+        self.habits = [Habit(name, "daily", 10, 0, "Test description")
+                       for name in ["Daily Exercise", "Daily Reading", "Daily Meditation", "Weekly Review"]]
+        self.index = NameIndex(self.habits)
+
+    def test_find_ignores_case(self):
+        """
+        Test that names are found regardless of their case.
+        """
+        self.assertIs(self.index.find("daily reading"), self.habits[1])
+        self.assertIsNone(self.index.find("Daily"))
+
+    def test_complete_prefix(self):
+        """
+        Test that autocompletion returns the names starting with the prefix in alphabetical order.
+        """
+        self.assertEqual(self.index.complete("dail"), ["Daily Exercise", "Daily Meditation", "Daily Reading"])
+        self.assertEqual(self.index.complete("daily r"), ["Daily Reading"])
+        self.assertEqual(self.index.complete("monthly"), [])
+
+    def test_suggest_mistyped_name(self):
+        """
+        Test that a mistyped name suggests the closest existing name first.
+        """
+        self.assertEqual(self.index.suggest("Daly Readng")[0], "Daily Reading")
+        self.assertEqual(self.index.suggest("Weekly Reveiw")[0], "Weekly Review")
+        self.assertEqual(self.index.suggest("xyz"), [])
+
+    def test_remove_updates_every_structure(self):
+        """
+        Test that a removed habit can no longer be found, completed or suggested.
+        """
+        self.index.remove(self.habits[1])
+        self.assertIsNone(self.index.find("Daily Reading"))
+        self.assertEqual(self.index.complete("daily r"), [])
+        self.assertNotIn("Daily Reading", self.index.suggest("Daily Reading"))
+        self.assertEqual(self.index.complete("daily"), ["Daily Exercise", "Daily Meditation"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+This a Unit tests for the tenancy module of the Habit Tracker project.
+
+This module tests that users get separate sharded data directories, and that the
+least recently used tenant stores nobody uses are flushed and closed when the cache is full.
+"""
+
+import os
+import tempfile
+import unittest
+
+from habit import Habit
+from tenancy import TenantStores, tenant_data_dir
+from utility import load_habits
+
+
+class TestTenancy(unittest.TestCase):
+    """
+    Test suite for the per-user tenant stores.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_tenant_data_dir_is_sharded(self):
+        """
+        Test that a user's directory sits in a hash prefix shard, and that unsafe user IDs are rejected.
+        """
+        data_dir = tenant_data_dir(self.root, "alice")
+        self.assertEqual(os.path.basename(data_dir), "alice")
+        self.assertEqual(len(os.path.basename(os.path.dirname(data_dir))), 2)
+        with self.assertRaises(ValueError):
+            tenant_data_dir(self.root, "../bob")
+
+    def test_users_are_isolated(self):
+        """
+        Test that the habits of one user are not visible to another user.
+        """
+        stores = TenantStores(self.root)
+        stores.get("alice").add_habit(Habit("Read", "daily", 10, 0, "Test description"))
+        stores.get("bob").add_habit(Habit("Run", "weekly", 4, 0, "Test description"))
+        stores.close()
+
+        self.assertEqual([habit.name for habit in load_habits(tenant_data_dir(self.root, "alice"))], ["Read"])
+        self.assertEqual([habit.name for habit in load_habits(tenant_data_dir(self.root, "bob"))], ["Run"])
+
+    def test_least_recently_used_store_is_evicted(self):
+        """
+        Test that opening a store beyond the limit evicts and flushes the least recently used store.
+        """
+        stores = TenantStores(self.root, max_open=2)
+        stores.get("alice")
+        stores.get("bob").add_habit(Habit("Run", "weekly", 4, 0, "Test description"))
+        stores.get("alice")
+        stores.get("bob")
+        stores.get("carol")
+
+        self.assertIn("bob", stores)
+        self.assertNotIn("alice", stores)
+        stores.get("alice")
+        self.assertNotIn("bob", stores)
+        # The deferred save of the evicted store must have been written by the eviction.
+        self.assertEqual([habit.name for habit in load_habits(tenant_data_dir(self.root, "bob"))], ["Run"])
+        stores.close()
+        self.assertEqual(len(stores), 0)
+
+    def test_store_in_use_is_not_evicted(self):
+        """
+        Test that a pinned store survives opening other users, is evicted once released,
+        and that an evicted store rejects any further use.
+        """
+        stores = TenantStores(self.root, max_open=1)
+        with stores.use("alice") as alice:
+            with stores.use("bob") as bob:
+                bob.add_habit(Habit("Run", "weekly", 4, 0, "Test description"))
+            alice.add_habit(Habit("Read", "daily", 10, 0, "Test description"))
+            self.assertFalse(alice.closed)
+            self.assertIn("alice", stores)
+
+        self.assertNotIn("bob", stores)
+        self.assertTrue(bob.closed)
+        with self.assertRaises(RuntimeError):
+            bob.add_habit(Habit("Swim", "weekly", 4, 0, "Test description"))
+        stores.close()
+
+        self.assertEqual([habit.name for habit in load_habits(tenant_data_dir(self.root, "alice"))], ["Read"])
+        self.assertEqual([habit.name for habit in load_habits(tenant_data_dir(self.root, "bob"))], ["Run"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+This a Unit tests for the utility module of the Habit Tracker project.
+
+This module tests the write-behind saving of the habits file.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from habit import Habit
+from utility import WriteBehind
+
+
+class TestWriteBehind(unittest.TestCase):
+    """
+    Test suite for the coalesced saving of the habits file.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "habits.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_deferred_saves_are_written_on_flush(self):
+        """
+        Test that deferred saves only reach the file on flush, with the latest habits.
+        """
+        writer = WriteBehind(self.file_path, "deferred", interval=60)
+        habits = [Habit("Test Habit", "daily", 10, 0, "Test description")]
+        writer.save(habits)
+        habits.append(Habit("Other Habit", "weekly", 4, 0, "Test description"))
+        writer.save(habits)
+        self.assertFalse(os.path.exists(self.file_path))
+
+        writer.flush()
+        with open(self.file_path, "r") as file:
+            self.assertEqual([habit["name"] for habit in json.load(file)["habits"]], ["Test Habit", "Other Habit"])
+
+    def test_fsync_level_writes_immediately(self):
+        """
+        Test that the fsync durability level writes on every save.
+        """
+        writer = WriteBehind(self.file_path, "fsync")
+        writer.save([Habit("Test Habit", "daily", 10, 0, "Test description")])
+        self.assertTrue(os.path.exists(self.file_path))
+
+    def test_invalid_durability_level(self):
+        """
+        Test that an unknown durability level is rejected.
+        """
+        with self.assertRaises(ValueError):
+            WriteBehind(self.file_path, "sometimes")
+
+
+if __name__ == "__main__":
+    unittest.main()
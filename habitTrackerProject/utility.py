@@ -1,49 +1,210 @@
 import json
 import os
+import threading
 
+from archive import CompletedArchive
+from habit import Habit
+from migrations import SCHEMA_VERSION, document_version, migrate, migrate_file
+from settings import DATA_DIR
 
-def save_habits(habits):
+# Durability levels of the habits file:
+#   "fsync"    - every save is written and forced to disk before returning.
+#   "write"    - every save is written, the operating system decides when it reaches the disk.
+#   "deferred" - saves only mark the habits as dirty, they are written on a timer, on flush() or on exit.
+DURABILITY_LEVELS = ("fsync", "write", "deferred")
+
+# The write-behind writers that are currently active, by absolute path of the file they write.
+_write_behind = {}
+
+
+def habits_file(data_dir=DATA_DIR):
+    """Returns the path of the habits file inside a data directory."""
+    return os.path.join(data_dir, "habits.json")
+
+
+def load_habits(data_dir=DATA_DIR, read_only=False):
+    """
+    Loads habits from the JSON file of a data directory.
+
+    Files written with the current schema version are trusted as they are. A file written by an
+    older version is migrated once (the old file is kept next to it as a backup) and then loaded.
+    When the habits are only read, an older file is migrated in memory and left untouched on disk.
+
+    Args:
+        data_dir (str): The data directory holding 'habits.json'.
+        read_only (bool): Whether to leave the file as it is, even if it has an older schema version.
+
+    Returns:
+        list: A list of Habit objects, or an empty list if the file is missing or unreadable.
+    """
+    file_path = habits_file(data_dir)
+    if not os.path.exists(file_path):
+        return []
+    with open(file_path, "r") as file:
+        try:
+            data = json.load(file)
+        except json.JSONDecodeError:
+            return []
+
+    if document_version(data) != SCHEMA_VERSION and read_only:
+        data = migrate(data)
+    elif document_version(data) != SCHEMA_VERSION:
+        migrate_file(file_path)
+        with open(file_path, "r") as file:
+            data = json.load(file)
+    return [Habit.from_canonical(habit) for habit in data["habits"]]
+
+
+def save_habits(habits, data_dir=DATA_DIR):
     """
     The function saves the list of active habits to a JSON file.
 
     It converts each Habit object to a dictionary using the to_dict() method,
-    and then writes the proceeding list to 'data/habits.json'. However, if the 'data' directory does not exist,
-    it will be created.
+    and then writes the proceeding list to 'habits.json' in the data directory.
+    However, if the data directory does not exist, it will be created.
+
+    If a write-behind writer was enabled for the file, the save is handed over to it instead,
+    which may coalesce it with later saves.
+
+    Args:
+        habits (list): list of Habit objects representing active habits.
+        data_dir (str): The data directory to save the habits in.
+    """
+    # Set up the file path for the habits file
+    file_path = habits_file(data_dir)
+
+    writer = _write_behind.get(os.path.abspath(file_path))
+    if writer is not None:
+        writer.save(habits)
+    else:
+        write_habits_file(file_path, habits)
+
+
+def write_habits_file(file_path, habits, fsync=False):
+    """
+    Writes the habits to a JSON file right away.
+
+    The data is written to a temporary file first, which then replaces the old file,
+    so a crash during the write never leaves a half written habits file behind.
 
     Args:
+        file_path (str): The path of the habits file.
         habits (list): list of Habit objects representing active habits.
+        fsync (bool): Whether to force the data to disk before returning.
     """
-    data_dir = "data"
+    data_dir = os.path.dirname(file_path)
     # produce the data directory if it does not exist
-    if not os.path.exists(data_dir):
+    if data_dir and not os.path.exists(data_dir):
         os.makedirs(data_dir)
 
-    # Set up the file path for the habits file
-    file_path = os.path.join(data_dir, "habits.json")
+    # Then changing each habit object to a dictionary, inside the envelope of the current schema version
+    data = {"schema_version": SCHEMA_VERSION, "habits": [habit.to_dict() for habit in list(habits)]}
+    # Opening the file and then writing the JSON data in compact form, which is smaller and faster to parse
+    temp_path = file_path + ".tmp"
+    with open(temp_path, "w") as file:
+        json.dump(data, file, separators=(",", ":"))
+        if fsync:
+            file.flush()
+            os.fsync(file.fileno())
+    os.replace(temp_path, file_path)
+
+
+class WriteBehind:
+    """
+    Coalesces the saves of the habits file during a session.
+
+    With the "deferred" durability level, save() only remembers the habits and marks them dirty.
+    The file is then written once when the timer fires, when flush() is called, or when the writer is closed,
+    no matter how many saves happened in between. The other levels write on every save.
+
+    Args:
+        file_path (str): The path of the habits file.
+        durability (str): One of DURABILITY_LEVELS.
+        interval (float): The number of seconds a deferred save waits before it is written.
+    """
+
+    def __init__(self, file_path, durability="deferred", interval=2.0):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"Invalid durability level: {durability}")
+        self.file_path = file_path
+        self.durability = durability
+        self.interval = interval
+        self._habits = None
+        self._dirty = False
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def save(self, habits):
+        """
+        Saves the habits according to the durability level.
+
+        Args:
+            habits (list): list of Habit objects representing active habits.
+        """
+        if self.durability != "deferred":
+            with self._lock:
+                write_habits_file(self.file_path, habits, fsync=self.durability == "fsync")
+            return
+
+        with self._lock:
+            self._habits = habits
+            self._dirty = True
+            # Only one timer is pending at a time, later saves are picked up by the same write.
+            if self._timer is None:
+                self._timer = threading.Timer(self.interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
 
-    # Then changing each habit object to a dictionary
-    data = [habit.to_dict() for habit in habits]
-    # Opening the file and then writing the JSON data with indentation for the purpose of readability
-    with open(file_path, "w") as file:
-        json.dump(data, file, indent=4)
+    def flush(self):
+        """Writes the habits to the file if there are unsaved changes."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            write_habits_file(self.file_path, self._habits, fsync=True)
+            self._dirty = False
 
+    def close(self):
+        """Flushes the pending changes and stops handling the saves of the file."""
+        self.flush()
+        _write_behind.pop(os.path.abspath(self.file_path), None)
 
-def save_completed_habits(completed_habits):
+
+def enable_write_behind(durability="deferred", interval=2.0, data_dir=DATA_DIR):
+    """
+    Routes every save_habits() call for the habits file of a data directory through a write-behind writer.
+
+    Args:
+        durability (str): One of DURABILITY_LEVELS.
+        interval (float): The number of seconds a deferred save waits before it is written.
+        data_dir (str): The data directory holding the habits file.
+
+    Returns:
+        WriteBehind: The writer, which must be flushed or closed before the program exits.
+    """
+    file_path = habits_file(data_dir)
+    writer = WriteBehind(file_path, durability, interval)
+    _write_behind[os.path.abspath(file_path)] = writer
+    return writer
+
+
+def flush():
+    """Writes the pending changes of every active write-behind writer."""
+    for writer in list(_write_behind.values()):
+        writer.flush()
+
+
+def save_completed_habits(completed_habits, data_dir=DATA_DIR):
     """
-    It saves the list of the completed habits to a JSON file.
+    It saves the list of the completed habits to the completed habits archive.
 
-    This function converts each completed Habit object to a dictionary using the to_dict() method,
-    and then writes the resulting list to 'data/completed_habits.json'. If the 'data' directory does not exist,
-    it will be created.
+    This function replaces the content of the archive in the data directory with the given habits.
+    If the data directory does not exist, it will be created.
 
     Args:
         completed_habits (list): A list of Habit objects representing completed habits.
+        data_dir (str): The data directory holding the archive.
     """
-    data_dir = "data"
-    if not os.path.exists(data_dir):
-        os.makedirs(data_dir)
-
-    file_path = os.path.join(data_dir, "completed_habits.json")
-    data = [habit.to_dict() for habit in completed_habits]
-    with open(file_path, "w") as file:
-        json.dump(data, file, indent=4)
+    CompletedArchive(data_dir).rewrite(completed_habits)